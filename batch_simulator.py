@@ -0,0 +1,160 @@
+# batch_simulator.py
+import numpy as np
+from simulation_types import ROSTER_FIELDS, STAT_FIELDS, StatLine
+
+def build_roster_arrays(players):
+    """Convert a list of Player records into a struct-of-arrays roster."""
+    roster = {
+        field: np.array([getattr(player, field) for player in players], dtype=np.float64)
+        for field in ROSTER_FIELDS
+    }
+    roster['player_id'] = np.array([player.player_id for player in players], dtype=np.int64)
+    return roster
+
+def _seed_words(seed):
+    """Split an integer seed into 32-bit words the way random.seed() does."""
+    seed = abs(int(seed))
+    words = []
+    while seed:
+        words.append(seed & 0xFFFFFFFF)
+        seed >>= 32
+    return words or [0]
+
+def make_rng(seed=None):
+    """
+    Return a NumPy random source for the batch engine.
+
+    Integer seeds produce a Mersenne Twister stream seeded exactly like
+    random.seed(seed), so the batch engine draws the same numbers as the
+    scalar simulate_player_performance path. An existing RandomState or
+    Generator is returned unchanged.
+    """
+    if isinstance(seed, (np.random.RandomState, np.random.Generator)):
+        return seed
+    if seed is None:
+        return np.random.RandomState()
+    return np.random.RandomState(_seed_words(seed))
+
+def allocate_minutes_batch(bench_counts, rng=None, max_bench=None):
+    """
+    Vectorized allocate_minutes for many games at once.
+
+    Parameters:
+    - bench_counts: bench size per game, shape (n_games,)
+    - rng: int seed, RandomState/Generator, or None
+    - max_bench: number of bench columns to return (defaults to the largest bench)
+
+    Returns minutes shaped (n_games, 5 + max_bench) with the five starters first.
+    Bench columns beyond a game's bench size get 0 minutes. Follows the same
+    rules as allocate_minutes; draws are not in the scalar path's order.
+    """
+    rng = make_rng(rng)
+    bench_counts = np.asarray(bench_counts, dtype=np.int64)
+    n_games = bench_counts.shape[0]
+    if max_bench is None:
+        max_bench = int(bench_counts.max()) if n_games else 0
+
+    total_game_minutes = 240  # 48 minutes × 5 players
+    minutes = np.zeros((n_games, 5 + max_bench))
+
+    # Base minutes for starters
+    minutes[:, :5] = 30 + rng.uniform(-3, 3, size=(n_games, 5))
+    remaining = total_game_minutes - minutes[:, :5].sum(axis=1)
+
+    # Bench players share what's left; the last one takes the remainder exactly
+    base_bench_per_player = remaining / np.maximum(bench_counts, 1)
+    for slot in range(max_bench):
+        draw = np.minimum(base_bench_per_player + rng.uniform(-2, 2, size=n_games), remaining)
+        slot_minutes = np.where(slot == bench_counts - 1, remaining, np.where(slot < bench_counts, draw, 0.0))
+        minutes[:, 5 + slot] = slot_minutes
+        remaining = remaining - slot_minutes
+
+    # Ensure no negative minutes and round to 1 decimal
+    return np.round(np.maximum(minutes, 0), 1)
+
+def simulate_player_performance_batch(roster, minutes_played, is_starter=False, is_home_team=False,
+                                      n_games=1, randomness_factor=0.2, performance_boost=1.0, rng=None,
+                                      fields=STAT_FIELDS):
+    """
+    Simulate stat lines for every player in a roster over many games at once.
+
+    Parameters:
+    - roster: dict of arrays keyed by ROSTER_FIELDS (see build_roster_arrays)
+    - minutes_played: minutes per player, shape (n_players,) or (n_games, n_players)
+    - is_starter: bool or bool array broadcastable to (n_games, n_players)
+    - is_home_team: bool or bool array broadcastable to (n_games, n_players)
+    - n_games: number of games to simulate
+    - randomness_factor: float, half-width of the random performance swing
+    - performance_boost: float or array broadcastable to (n_games, n_players)
+    - rng: int seed, RandomState/Generator, or None
+    - fields: subset of STAT_FIELDS to compute, e.g. ('points',) for scores only
+
+    Returns a dict of arrays keyed by fields, each shaped (n_games, n_players).
+    Row g, column p equals what simulate_player_performance returns for player p
+    in game g when the scalar path is seeded with the same integer seed and
+    called game by game, player by player.
+    """
+    rng = make_rng(rng)
+
+    avg_points = np.asarray(roster['avg_points'], dtype=np.float64)
+    fg_percentage = np.asarray(roster['fg_percentage'], dtype=np.float64)
+    minutes = np.asarray(minutes_played, dtype=np.float64)
+    starters = np.asarray(is_starter, dtype=bool)
+    home = np.asarray(is_home_team, dtype=bool)
+
+    shape = np.broadcast_shapes(
+        (n_games, 1),
+        avg_points.shape,
+        minutes.shape,
+        starters.shape,
+        home.shape,
+        np.shape(performance_boost),
+    )
+
+    # Base multiplier for minutes played
+    minutes_multiplier = minutes / 48.0
+
+    # (5% boost for home team)
+    home_advantage = np.where(home, 1.05, 1.0)
+
+    # (15% boost for starters)
+    starter_boost = np.where(starters, 1.15, 0.85)
+
+    # (-20% to +20% by default), drawn game by game, player by player
+    random_multiplier = 1.0 + rng.uniform(-randomness_factor, randomness_factor, size=shape)
+
+    # Same multiplication order as the scalar path so results match bit for bit
+    performance_multiplier = minutes_multiplier * random_multiplier * home_advantage * starter_boost * performance_boost
+
+    stats = {}
+
+    if 'fga' in fields or 'fgm' in fields:
+        # Attempted field goals based on average points and FG percentage
+        avg_fga = (avg_points / 2) / np.where(fg_percentage > 0, fg_percentage, 0.4)
+
+        # np.rint rounds half to even, like Python's round()
+        fga = np.rint(avg_fga * performance_multiplier)
+        stats['fgm'] = np.rint(fga * fg_percentage * random_multiplier)
+        stats['fga'] = fga
+
+    if 'points' in fields:
+        stats['points'] = np.rint(avg_points * performance_multiplier)
+
+    for field in ('rebounds', 'assists', 'steals', 'blocks', 'turnovers', 'fouls'):
+        if field in fields:
+            stats[field] = np.rint(roster['avg_' + field] * performance_multiplier)
+
+    if 'fouls' in fields:
+        stats['fouls'] = np.minimum(6, stats['fouls'])
+
+    stats = {field: stats[field].astype(np.int64) for field in fields if field != 'minutes_played'}
+    if 'minutes_played' in fields:
+        stats['minutes_played'] = np.broadcast_to(minutes, shape).copy()
+    return stats
+
+def stat_line(batch_stats, game_index, player_index):
+    """Extract one player's stat line from a batch result as a StatLine."""
+    return StatLine(
+        *(int(batch_stats[key][game_index, player_index]) for key in STAT_FIELDS if key != 'minutes_played'),
+        float(batch_stats['minutes_played'][game_index, player_index])
+    )
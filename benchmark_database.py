@@ -0,0 +1,94 @@
+# benchmark_database.py
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import database_setup
+from database_setup import Session, create_database_engine, migrate_schema
+from caching import data_versions, roster_cache
+from game_history import load_game_history
+from game_simulator import simulate_game
+from season_simulator import simulate_league_season
+
+# What SQLite uses when no pragmas are set (a file copied from a WAL database stays in WAL)
+SQLITE_DEFAULT_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL'
+}
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+def _read_history(pages, page_size):
+    """Page through the game history like /game_history does"""
+    session = Session()
+    try:
+        cursor = None
+        for _ in range(pages):
+            games, cursor = load_game_history(session, limit=page_size, cursor=cursor)
+            if cursor is None:
+                break
+    finally:
+        session.close()
+
+def _simulate_games(count):
+    """Single games, each committed on its own like /simulate_game"""
+    home_players = [player.player_id for player in roster_cache.get_team_players(1)[:8]]
+    away_players = [player.player_id for player in roster_cache.get_team_players(2)[:8]]
+    for game in range(count):
+        simulate_game(home_players, away_players, seed=game)
+
+def run_benchmark(database_path, pragmas, seasons=1, games=200, readers=8, reads=200, page_size=20):
+    """
+    Run single games, league seasons and concurrent history reads against a
+    copy of database_path using an engine with the given pragmas. Returns
+    timings in seconds.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        copy_path = os.path.join(directory, 'benchmark.db')
+        shutil.copyfile(database_path, copy_path)
+        engine = create_database_engine(f'sqlite:///{copy_path}', echo=False, pragmas=pragmas)
+        migrate_schema(engine)
+        Session.configure(bind=engine)
+        data_versions.bump('rosters', 'season', 'games')
+        try:
+            timings = {'games': _timed(_simulate_games, games), 'season': 0.0}
+            for season in range(seasons):
+                timings['season'] += _timed(simulate_league_season, season_id=3000 + season, seed=season)
+
+            with ThreadPoolExecutor(max_workers=readers) as executor:
+                start = time.perf_counter()
+                list(executor.map(lambda _: _read_history(3, page_size), range(reads)))
+                timings['history'] = time.perf_counter() - start
+
+            # Reads while a season is being written, the case WAL is meant for
+            with ThreadPoolExecutor(max_workers=readers + 1) as executor:
+                start = time.perf_counter()
+                writer = executor.submit(simulate_league_season, season_id=3000 + seasons, seed=seasons)
+                list(executor.map(lambda _: _read_history(3, page_size), range(reads)))
+                writer.result()
+                timings['mixed'] = time.perf_counter() - start
+            return timings
+        finally:
+            engine.dispose()
+            Session.configure(bind=database_setup.engine)
+            data_versions.bump('rosters', 'season', 'games')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare default and tuned SQLite settings on season writes and history reads")
+    parser.add_argument('--database', default='nba_simulator.db', help="database to copy for each run")
+    parser.add_argument('--games', type=int, default=200, help="single games to simulate per run")
+    parser.add_argument('--seasons', type=int, default=1, help="league seasons to simulate per run")
+    parser.add_argument('--readers', type=int, default=8, help="concurrent history reader threads")
+    parser.add_argument('--reads', type=int, default=200, help="history reads (3 pages each) per run")
+    args = parser.parse_args()
+
+    configurations = (('default', SQLITE_DEFAULT_PRAGMAS), ('tuned', database_setup.SQLITE_PRAGMAS))
+    for name, pragmas in configurations:
+        timings = run_benchmark(args.database, pragmas, seasons=args.seasons, games=args.games, readers=args.readers, reads=args.reads)
+        print(f"{name:>8}: {args.games} games {timings['games']:.2f}s, season {timings['season']:.2f}s, history {timings['history']:.2f}s, "
+              f"history during season {timings['mixed']:.2f}s")
@@ -0,0 +1,195 @@
+# caching.py
+import threading
+from collections import OrderedDict, namedtuple
+from database_setup import Session, Player, Team
+
+class DataVersions:
+    """
+    Counters that move forward whenever a kind of data changes ('season',
+    'games', ...). Cache keys include the current version, so bumping it
+    invalidates every entry built from the old data.
+    """
+
+    def __init__(self):
+        self.versions = {}
+        self.lock = threading.Lock()
+
+    def get(self, name):
+        with self.lock:
+            return self.versions.get(name, 0)
+
+    def bump(self, *names):
+        """Mark the named data as changed"""
+        with self.lock:
+            for name in names:
+                self.versions[name] = self.versions.get(name, 0) + 1
+
+data_versions = DataVersions()
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with hit/miss counters. Bounded by
+    entry count and, if max_bytes is set, by the total size passed to put().
+    """
+
+    def __init__(self, max_entries=128, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value, size=0):
+        with self.lock:
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            if key in self.entries:
+                self.total_bytes -= self.sizes[key]
+            self.entries[key] = value
+            self.sizes[key] = size
+            self.total_bytes += size
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries or \
+                    (self.max_bytes is not None and self.total_bytes > self.max_bytes):
+                evicted, _ = self.entries.popitem(last=False)
+                self.total_bytes -= self.sizes.pop(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+# Immutable copies of Player and Team rows, with the same attribute names
+PlayerSnapshot = namedtuple('PlayerSnapshot', [column.name for column in Player.__table__.columns])
+TeamSnapshot = namedtuple('TeamSnapshot', [column.name for column in Team.__table__.columns])
+
+def _snapshot(snapshot_type, row):
+    return snapshot_type(*(getattr(row, field) for field in snapshot_type._fields))
+
+class RosterCache:
+    """
+    In-memory snapshots of teams and players, which only change when rosters
+    are repopulated or a season simulation writes season stats.
+
+    Entries are loaded on first use and dropped as a whole when the 'rosters'
+    or 'season' data version moves, so callers never see stale ratings.
+    Snapshots are namedtuples and cannot be modified by callers.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.teams = None
+        self.players = {}
+        self.team_players = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _current(self):
+        """Drop everything if the underlying data changed. Call with the lock held."""
+        version = (data_versions.get('rosters'), data_versions.get('season'))
+        if version != self.version:
+            self.version = version
+            self.teams = None
+            self.players = {}
+            self.team_players = {}
+
+    def get_teams(self):
+        """All teams, in table order"""
+        with self.lock:
+            self._current()
+            if self.teams is not None:
+                self.hits += 1
+                return list(self.teams.values())
+            self.misses += 1
+            session = Session()
+            try:
+                self.teams = OrderedDict(
+                    (team.team_id, _snapshot(TeamSnapshot, team)) for team in session.query(Team).all()
+                )
+            finally:
+                session.close()
+            return list(self.teams.values())
+
+    def get_team(self, team_id):
+        """One team, or None if it does not exist"""
+        return next((team for team in self.get_teams() if team.team_id == team_id), None)
+
+    def get_team_players(self, team_id):
+        """A team's players, best scorers first (the order /get_team_players has always used)"""
+        with self.lock:
+            self._current()
+            if team_id in self.team_players:
+                self.hits += 1
+                return self.team_players[team_id]
+            self.misses += 1
+            session = Session()
+            try:
+                players = tuple(
+                    _snapshot(PlayerSnapshot, player)
+                    for player in session.query(Player)
+                        .filter_by(team_id=team_id)
+                        .order_by(Player.avg_points.desc())
+                        .all()
+                )
+            finally:
+                session.close()
+            self.team_players[team_id] = players
+            self.players.update((player.player_id, player) for player in players)
+            return players
+
+    def get_players(self, player_ids):
+        """Players with the given IDs, ordered by player ID. Unknown IDs are skipped."""
+        player_ids = set(player_ids)
+        with self.lock:
+            self._current()
+            missing = player_ids - self.players.keys()
+            if missing:
+                self.misses += 1
+                session = Session()
+                try:
+                    for player in session.query(Player).filter(Player.player_id.in_(missing)).all():
+                        self.players[player.player_id] = _snapshot(PlayerSnapshot, player)
+                finally:
+                    session.close()
+            else:
+                self.hits += 1
+            return [self.players[player_id] for player_id in sorted(player_ids) if player_id in self.players]
+
+    def invalidate(self):
+        """Forget every snapshot, e.g. after players are repopulated"""
+        data_versions.bump('rosters')
+
+    def stats(self):
+        with self.lock:
+            return {
+                'teams_loaded': self.teams is not None,
+                'players': len(self.players),
+                'team_rosters': len(self.team_players),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+roster_cache = RosterCache()
@@ -0,0 +1,114 @@
+# compression.py
+import gzip
+import hashlib
+import os
+import threading
+import zlib
+
+# Smaller bodies are sent as they are; compressing them saves less than it costs
+COMPRESSION_MIN_BYTES = 1024
+
+# Content codings we can produce, in order of preference when the client rates them equally
+ENCODINGS = ('gzip', 'deflate')
+
+CONTENT_TYPES = {
+    '.html': 'text/html',
+    '.css': 'text/css',
+    '.js': 'application/javascript',
+}
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pick the content coding for a response from an Accept-Encoding header.
+    Returns 'gzip', 'deflate' or None for identity.
+    """
+    if not accept_encoding:
+        return None
+
+    qualities = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compress(body, encoding, level=6):
+    """Compress body with 'gzip' or 'deflate' (zlib format, as HTTP defines it)"""
+    if encoding == 'gzip':
+        # mtime=0 so the same body always compresses to the same bytes
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == 'deflate':
+        return zlib.compress(body, level)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+def compressor(encoding, level=6):
+    """Incremental compressor for streamed bodies; call compress() per piece, then flush()"""
+    if encoding == 'gzip':
+        return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return zlib.compressobj(level)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+def encoded_etag(etag, encoding):
+    """ETag of the compressed representation of a body with the given ETag"""
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+class StaticFile:
+    """One static file held in memory, with its precompressed variants"""
+
+    def __init__(self, path, mtime, body):
+        self.path = path
+        self.mtime = mtime
+        self.content_type = CONTENT_TYPES.get(os.path.splitext(path)[1])
+        self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        self.bodies = {None: body}
+        for encoding in ENCODINGS:
+            compressed = compress(body, encoding, level=9)
+            if len(compressed) < len(body):
+                self.bodies[encoding] = compressed
+
+class StaticFileCache:
+    """
+    Static files read once and kept in memory, uncompressed and
+    precompressed. A file is read again only when its mtime changes.
+    """
+
+    def __init__(self, directory='.'):
+        self.directory = directory
+        self.files = {}
+        self.lock = threading.Lock()
+
+    def preload(self, filenames):
+        """Read files ahead of the first request. Missing files are skipped."""
+        for filename in filenames:
+            try:
+                self.get(filename)
+            except FileNotFoundError:
+                pass
+
+    def get(self, filename):
+        """The StaticFile for filename, reloaded if it changed on disk. Raises FileNotFoundError."""
+        path = os.path.join(self.directory, filename)
+        mtime = os.stat(path).st_mtime_ns
+        with self.lock:
+            cached = self.files.get(filename)
+            if cached is not None and cached.mtime == mtime:
+                return cached
+
+        with open(path, 'rb') as f:
+            static_file = StaticFile(path, mtime, f.read())
+        with self.lock:
+            self.files[filename] = static_file
+        return static_file
@@ -1,11 +1,71 @@
 # database_setup.py
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, Time, ForeignKey, Boolean
+import os
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, Date, Time, ForeignKey, Boolean, Index, inspect
+from sqlalchemy import select, insert, delete, union_all, case, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.pool import QueuePool
 from datetime import datetime
 
+DATABASE_URL = os.environ.get('NBA_DATABASE_URL', 'sqlite:///nba_simulator.db')
+
+# Set on every new SQLite connection. WAL lets the HTTP threads read while a
+# simulation writes, and NORMAL only syncs at checkpoints, which is safe in WAL mode.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,  # Negative means KiB, so 64 MB per connection
+    'temp_store': 'MEMORY'
+}
+
+# Enough connections for the HTTP worker threads plus the simulation workers
+DB_POOL_SIZE = int(os.environ.get('NBA_DB_POOL_SIZE', 10))
+
+def _env_flag(name):
+    return os.environ.get(name, '').lower() in ('1', 'true', 'yes', 'on')
+
+def create_database_engine(url=DATABASE_URL, echo=None, pragmas=None, pool_size=DB_POOL_SIZE):
+    """
+    Create an engine for the simulator database.
+    
+    Parameters:
+    - url: database URL (NBA_DATABASE_URL, or nba_simulator.db in the working directory)
+    - echo: bool, log every SQL statement (defaults to the NBA_SQL_ECHO environment variable)
+    - pragmas: dict of SQLite pragmas set on each new connection (SQLITE_PRAGMAS if None)
+    - pool_size: int, connections kept open; Session() borrows one and returns it on close
+    
+    File databases get a QueuePool whose connections may be used from any
+    thread, since the server hands sessions to a thread pool.
+    """
+    if echo is None:
+        echo = _env_flag('NBA_SQL_ECHO')
+    if pragmas is None:
+        pragmas = SQLITE_PRAGMAS
+    
+    options = {'echo': echo}
+    is_sqlite = url.startswith('sqlite')
+    if is_sqlite and ':memory:' not in url and url not in ('sqlite://', 'sqlite:///'):
+        options.update(
+            poolclass=QueuePool,
+            pool_size=pool_size,
+            max_overflow=pool_size,
+            connect_args={'check_same_thread': False, 'timeout': 30}
+        )
+    engine = create_engine(url, **options)
+    
+    if is_sqlite and pragmas:
+        @event.listens_for(engine, 'connect')
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+            cursor.close()
+    
+    return engine
+
 # Create database engine
-engine = create_engine('sqlite:///nba_simulator.db', echo=True)
+engine = create_database_engine()
 Base = declarative_base()
 
 # Define models
@@ -54,6 +114,11 @@ class Player(Base):
     season_apg = Column(Float, default=0.0)
     season_games = Column(Integer, default=0)
     
+    __table_args__ = (
+        # Team rosters ordered by scoring (rotations, /get_team_players)
+        Index('ix_players_team_avg_points', 'team_id', 'avg_points'),
+    )
+    
     team = relationship("Team", back_populates="players")
     game_lineups = relationship("GameLineup", backref="player")
     game_stats = relationship("PlayerGameStat", backref="player")
@@ -72,6 +137,17 @@ class Game(Base):
     away_team_id = Column(Integer, ForeignKey('teams.team_id'))
     is_season_game = Column(Boolean, default=False)  
     season_id = Column(Integer, nullable=True)  
+    seed = Column(Integer, nullable=True)  # RNG seed the result was simulated from, for replay
+    performance_boost = Column(Float, nullable=True)  # Boost the simulation applied to both teams
+    compact = Column(Boolean, default=False)  # Stored without stat lines; box score is replayed from seed
+    
+    __table_args__ = (
+        # Team schedules and season results filter on one side of the matchup
+        Index('ix_games_season_home_team', 'is_season_game', 'home_team_id'),
+        Index('ix_games_season_away_team', 'is_season_game', 'away_team_id'),
+        # Game history pages newest first
+        Index('ix_games_season_date_time', 'is_season_game', 'game_date', 'game_time', 'game_id'),
+    )
     
     lineups = relationship("GameLineup", backref="game")
     player_stats = relationship("PlayerGameStat", backref="game")
@@ -85,6 +161,10 @@ class GameLineup(Base):
     game_id = Column(Integer, ForeignKey('games.game_id'))
     team_id = Column(Integer, ForeignKey('teams.team_id'))
     player_id = Column(Integer, ForeignKey('players.player_id'))
+    
+    __table_args__ = (
+        Index('ix_game_lineups_game_player', 'game_id', 'player_id'),
+    )
 
 class PlayerGameStat(Base):
     __tablename__ = 'player_game_stats'
@@ -102,9 +182,147 @@ class PlayerGameStat(Base):
     minutes_played = Column(Float)
     game_id = Column(Integer, ForeignKey('games.game_id'))
     player_id = Column(Integer, ForeignKey('players.player_id'))
+    
+    __table_args__ = (
+        Index('ix_player_game_stats_game_player', 'game_id', 'player_id'),
+    )
+
+class TeamStanding(Base):
+    """Running record per team over all games, kept in step with the games table"""
+    __tablename__ = 'team_standings'
+    
+    team_id = Column(Integer, ForeignKey('teams.team_id'), primary_key=True)
+    games_played = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    losses = Column(Integer, nullable=False, default=0)
+    points_for = Column(Integer, nullable=False, default=0)
+    points_against = Column(Integer, nullable=False, default=0)
+
+class PlayerSeasonTotal(Base):
+    """A player's raw stat totals for one season; averages are derived on read"""
+    __tablename__ = 'player_season_totals'
+    
+    season_id = Column(Integer, primary_key=True)
+    player_id = Column(Integer, ForeignKey('players.player_id'), primary_key=True)
+    team_id = Column(Integer, ForeignKey('teams.team_id'))
+    games = Column(Integer, nullable=False, default=0)
+    points = Column(Integer, nullable=False, default=0)
+    rebounds = Column(Integer, nullable=False, default=0)
+    assists = Column(Integer, nullable=False, default=0)
+    fgm = Column(Integer, nullable=False, default=0)
+    fga = Column(Integer, nullable=False, default=0)
+    minutes_played = Column(Float, nullable=False, default=0.0)
+    
+    __table_args__ = (
+        Index('ix_player_season_totals_season_team', 'season_id', 'team_id'),
+    )
+    
+    @property
+    def ppg(self):
+        return self.points / self.games if self.games else 0.0
+    
+    @property
+    def rpg(self):
+        return self.rebounds / self.games if self.games else 0.0
+    
+    @property
+    def apg(self):
+        return self.assists / self.games if self.games else 0.0
+
+def team_totals_query(season_id=None, start_date=None, end_date=None):
+    """
+    Select (team_id, games_played, wins, losses, points_for, points_against)
+    for every team with at least one game, aggregated in SQL from the games table.
+    A tied game counts as a loss for both teams.
+    
+    Parameters:
+    - season_id: int, only count games from this season
+    - start_date, end_date: date, only count games played in this range (inclusive)
+    """
+    filters = []
+    if season_id is not None:
+        filters.append(Game.season_id == season_id)
+    if start_date is not None:
+        filters.append(Game.game_date >= start_date)
+    if end_date is not None:
+        filters.append(Game.game_date <= end_date)
+    
+    home = select(
+        Game.home_team_id.label('team_id'),
+        Game.home_team_score.label('points_for'),
+        Game.away_team_score.label('points_against')
+    ).where(*filters)
+    away = select(
+        Game.away_team_id.label('team_id'),
+        Game.away_team_score.label('points_for'),
+        Game.home_team_score.label('points_against')
+    ).where(*filters)
+    sides = union_all(home, away).subquery()
+    won = case((sides.c.points_for > sides.c.points_against, 1), else_=0)
+    
+    return select(
+        sides.c.team_id,
+        func.count().label('games_played'),
+        func.sum(won).label('wins'),
+        func.sum(1 - won).label('losses'),
+        func.coalesce(func.sum(sides.c.points_for), 0).label('points_for'),
+        func.coalesce(func.sum(sides.c.points_against), 0).label('points_against')
+    ).group_by(sides.c.team_id)
+
+def rebuild_team_standings(connection):
+    """Recompute team_standings from scratch, with a zero row for teams without games"""
+    totals = team_totals_query().subquery()
+    connection.execute(delete(TeamStanding))
+    connection.execute(insert(TeamStanding).from_select(
+        ['team_id', 'games_played', 'wins', 'losses', 'points_for', 'points_against'],
+        select(
+            Team.team_id,
+            func.coalesce(totals.c.games_played, 0),
+            func.coalesce(totals.c.wins, 0),
+            func.coalesce(totals.c.losses, 0),
+            func.coalesce(totals.c.points_for, 0),
+            func.coalesce(totals.c.points_against, 0)
+        ).outerjoin(totals, totals.c.team_id == Team.team_id)
+    ))
+
+def migrate_schema(bind=engine):
+    """
+    Bring an existing database up to date with the models. create_all only
+    adds missing tables, so nullable columns and indexes added to tables that
+    already exist are created here, and tables derived from existing games
+    are backfilled. Safe to run any number of times.
+    """
+    inspector = inspect(bind)
+    standings_missing = not inspector.has_table(TeamStanding.__tablename__)
+    Base.metadata.create_all(bind)
+    created = False
+    
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=bind.dialect)
+                    connection.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+    
+    for table in Base.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=bind)
+                created = True
+    
+    if created:
+        # Refresh planner statistics so SQLite uses both team indexes for home-or-away filters
+        with bind.begin() as connection:
+            connection.exec_driver_sql('ANALYZE')
+    
+    if standings_missing:
+        with bind.begin() as connection:
+            rebuild_team_standings(connection)
 
 # Create all tables
-Base.metadata.create_all(engine)
+migrate_schema()
 
 # Create session factory
 Session = sessionmaker(bind=engine)
@@ -0,0 +1,173 @@
+# game_history.py
+from datetime import date, time
+from sqlalchemy import or_, and_
+from database_setup import Team, Game, Player, PlayerGameStat
+from game_simulator import replay_box_scores
+
+def _player_line(stat, player):
+    """Format a box score line for one player"""
+    return {
+        'name': f"{player.first_name} {player.last_name}",
+        'position': player.position,
+        'jersey_number': player.jersey_number,
+        'stats': {
+            'points': stat.points,
+            'rebounds': stat.rebounds,
+            'assists': stat.assists,
+            'steals': stat.steals,
+            'blocks': stat.blocks,
+            'turnovers': stat.turnovers,
+            'fouls': stat.fouls,
+            'fgm': stat.fgm,
+            'fga': stat.fga,
+            'minutes': stat.minutes_played
+        }
+    }
+
+def encode_cursor(game):
+    """Build the keyset cursor that resumes listing after this game"""
+    return f"{game.game_date.isoformat()}_{game.game_time.isoformat()}_{game.game_id}"
+
+def decode_cursor(cursor):
+    """Parse a cursor from encode_cursor into (game_date, game_time, game_id)"""
+    try:
+        game_date, game_time, game_id = cursor.split('_')
+        return date.fromisoformat(game_date), time.fromisoformat(game_time), int(game_id)
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+def load_game_history(session, limit=None, cursor=None, since=None, after=None, summary=False):
+    """
+    Load non-season games, newest first, with both teams' box scores.
+
+    Games are ordered by (game_date, game_time, game_id) descending and paged
+    with a keyset cursor, so each page costs the same however deep it is.
+    Three queries run per page: the games, all teams, and every stat line in
+    the page, which are then grouped in memory. Box scores of compact games
+    are replayed from their seeds, which adds a query for their lineups (unless
+    cached) and one for their players. A compact game whose replay no longer
+    matches its score gets "box_score_available": false and no player lines.
+
+    Parameters:
+    - limit: int, maximum number of games to return (all games if None)
+    - cursor: str, next_cursor from a previous call, to continue after that page
+    - since: int, only return games with a game_id greater than this one
+    - after: str, cursor of the newest game a client already has; only games
+      ordered before it are returned. Resimulating a game moves it to the
+      current date and time, so this also picks up resimulated games.
+    - summary: bool, leave out player box scores (skips the stats query)
+
+    Returns (games, next_cursor). next_cursor is None on the last page.
+    """
+    page_query = session.query(Game)\
+        .filter(Game.is_season_game == False)\
+        .order_by(Game.game_date.desc(), Game.game_time.desc(), Game.game_id.desc())
+
+    if since is not None:
+        page_query = page_query.filter(Game.game_id > since)
+
+    if after is not None:
+        after_date, after_time, after_id = decode_cursor(after)
+        page_query = page_query.filter(or_(
+            Game.game_date > after_date,
+            and_(Game.game_date == after_date, or_(
+                Game.game_time > after_time,
+                and_(Game.game_time == after_time, Game.game_id > after_id)
+            ))
+        ))
+
+    if cursor is not None:
+        cursor_date, cursor_time, cursor_id = decode_cursor(cursor)
+        page_query = page_query.filter(or_(
+            Game.game_date < cursor_date,
+            and_(Game.game_date == cursor_date, or_(
+                Game.game_time < cursor_time,
+                and_(Game.game_time == cursor_time, Game.game_id < cursor_id)
+            ))
+        ))
+
+    if limit is not None:
+        page_query = page_query.limit(limit)
+
+    # Fetch one extra row to know whether another page exists
+    games = page_query.limit(limit + 1).all() if limit is not None else page_query.all()
+    next_cursor = None
+    if limit is not None and len(games) > limit:
+        games = games[:limit]
+        next_cursor = encode_cursor(games[-1])
+
+    if not games:
+        return [], None
+
+    teams = {team.team_id: team for team in session.query(Team).all()}
+
+    lines = {}
+    unavailable = set()
+    if not summary:
+        # Every stat line for the page, grouped by game and the player's team
+        page_ids = page_query.with_entities(Game.game_id).subquery()
+        stat_rows = session.query(PlayerGameStat, Player)\
+            .join(Player)\
+            .filter(PlayerGameStat.game_id.in_(page_ids.select()))\
+            .order_by(PlayerGameStat.stat_id)\
+            .all()
+
+        for stat, player in stat_rows:
+            lines.setdefault((stat.game_id, player.team_id), []).append(_player_line(stat, player))
+
+        # Compact games have no stat rows; their box scores are replayed
+        compact_games = [game for game in games if game.compact]
+        if compact_games:
+            box_scores = replay_box_scores(session, compact_games)
+            unavailable = {game_id for game_id, box_score in box_scores.items() if box_score is None}
+            box_scores = {game_id: box_score for game_id, box_score in box_scores.items() if box_score is not None}
+            player_ids = {player_id for box_score in box_scores.values() for _, player_id, _ in box_score}
+            players = {player.player_id: player for player in session.query(Player).filter(Player.player_id.in_(player_ids))}
+            for game_id, box_score in box_scores.items():
+                for team_id, player_id, stat in box_score:
+                    lines.setdefault((game_id, team_id), []).append(_player_line(stat, players[player_id]))
+
+    results = []
+    for game in games:
+        home_team = teams[game.home_team_id]
+        away_team = teams[game.away_team_id]
+
+        game_data = {
+            'game': {
+                'game_id': game.game_id,
+                'home_score': game.home_team_score,
+                'away_score': game.away_team_score,
+                'date': game.game_date,
+                'time': game.game_time,
+                'arena': game.arena,
+                'resimulated': game.resimulated
+            },
+            'home_team': {
+                'team_id': home_team.team_id,
+                'name': f"{home_team.city} {home_team.team_name}"
+            },
+            'away_team': {
+                'team_id': away_team.team_id,
+                'name': f"{away_team.city} {away_team.team_name}"
+            }
+        }
+        if not summary:
+            game_data['game']['box_score_available'] = game.game_id not in unavailable
+            game_data['home_team']['players'] = lines.get((game.game_id, game.home_team_id), [])
+            game_data['away_team']['players'] = lines.get((game.game_id, game.away_team_id), [])
+
+        results.append(game_data)
+
+    return results, next_cursor
+
+def iter_game_history(session, cursor=None, since=None, after=None, summary=False, batch_size=100):
+    """
+    Yield the same game dicts as load_game_history, to the end of the history,
+    loading batch_size games at a time. Memory use depends on batch_size, not
+    on how many games there are.
+    """
+    while True:
+        games, cursor = load_game_history(session, limit=batch_size, cursor=cursor, since=since, after=after, summary=summary)
+        yield from games
+        if cursor is None:
+            return
@@ -1,9 +1,31 @@
 from datetime import datetime
+import hashlib
 import random
-from database_setup import Session, Game, GameLineup, PlayerGameStat, Player, Team
+from sqlalchemy import insert
+from database_setup import Session, Game, GameLineup, PlayerGameStat
+from team_stats import apply_game_results
+from caching import LRUCache, roster_cache, data_versions
+from simulation_types import PlayerRating, StatLine, STAT_FIELDS, to_ratings
 
-def simulate_player_performance(player, minutes_played, is_starter=False, is_home_team=False, randomness_factor=0.2, performance_boost=1.0):
-    """Simulate a player's performance based on their averages and minutes played."""
+# Performance multiplier for both teams in favorite team games
+FAVORITE_TEAM_BOOST = 1.05
+
+# Box scores recently replayed for compact games, keyed by (game_id, seed, rosters version).
+# None is cached too, for games that cannot be replayed or no longer match their score.
+box_score_cache = LRUCache(max_entries=1024)
+_NOT_CACHED = object()
+
+# Most games one simulate_matchups call may run
+MAX_BATCH_GAMES = 10000
+
+def simulate_player_performance(player, minutes_played, is_starter=False, is_home_team=False, randomness_factor=0.2, performance_boost=1.0, rng=None):
+    """
+    Simulate a player's performance based on their averages and minutes played.
+    player is a PlayerRating (or anything with the same attributes); returns a StatLine.
+    rng is a random.Random to draw from (the global random module if None).
+    """
+    rng = rng or random
+    
     # Base multiplier for minutes played 
     minutes_multiplier = minutes_played / 48.0
     
@@ -14,7 +36,7 @@ def simulate_player_performance(player, minutes_played, is_starter=False, is_hom
     starter_boost = 1.15 if is_starter else 0.85
     
     # (-20% to +20% by default)
-    random_multiplier = 1.0 + random.uniform(-randomness_factor, randomness_factor)
+    random_multiplier = 1.0 + rng.uniform(-randomness_factor, randomness_factor)
     
     # Combine all multipliers including performance boost
     performance_multiplier = minutes_multiplier * random_multiplier * home_advantage * starter_boost * performance_boost
@@ -28,24 +50,26 @@ def simulate_player_performance(player, minutes_played, is_starter=False, is_hom
     # Adjust points calculation
     points = round(player.avg_points * performance_multiplier)
     
-    return {
-        'points': points,
-        'rebounds': round(player.avg_rebounds * performance_multiplier),
-        'assists': round(player.avg_assists * performance_multiplier),
-        'steals': round(player.avg_steals * performance_multiplier),
-        'blocks': round(player.avg_blocks * performance_multiplier),
-        'turnovers': round(player.avg_turnovers * performance_multiplier),
-        'fouls': min(6, round(player.avg_fouls * performance_multiplier)),
-        'fgm': fgm,
-        'fga': fga,
-        'minutes_played': minutes_played
-    }
+    return StatLine(
+        points,
+        round(player.avg_rebounds * performance_multiplier),
+        round(player.avg_assists * performance_multiplier),
+        round(player.avg_steals * performance_multiplier),
+        round(player.avg_blocks * performance_multiplier),
+        round(player.avg_turnovers * performance_multiplier),
+        min(6, round(player.avg_fouls * performance_multiplier)),
+        fgm,
+        fga,
+        minutes_played
+    )
 
-def allocate_minutes(starters, bench):
+def allocate_minutes(starters, bench, rng=None):
     """
     Allocate minutes to players based on starter status.
     Ensures total team minutes equals 240 (48 minutes × 5 players)
+    rng is a random.Random to draw from (the global random module if None).
     """
+    rng = rng or random
     total_game_minutes = 240  # 48 minutes × 5 players
     minutes_allocation = {}
     
@@ -56,7 +80,7 @@ def allocate_minutes(starters, bench):
     # First, allocate base minutes to starters
     remaining_minutes = total_game_minutes
     for starter in starters:
-        minutes = base_starter_minutes + random.uniform(-3, 3)
+        minutes = base_starter_minutes + rng.uniform(-3, 3)
         minutes_allocation[starter.player_id] = minutes
         remaining_minutes -= minutes
     
@@ -69,7 +93,7 @@ def allocate_minutes(starters, bench):
             if bench_player == bench[-1]:
                 minutes_allocation[bench_player.player_id] = remaining_minutes
             else:
-                minutes = min(base_bench_per_player + random.uniform(-2, 2), remaining_minutes)
+                minutes = min(base_bench_per_player + rng.uniform(-2, 2), remaining_minutes)
                 minutes_allocation[bench_player.player_id] = minutes
                 remaining_minutes -= minutes
     
@@ -79,7 +103,229 @@ def allocate_minutes(starters, bench):
     
     return minutes_allocation
 
-def simulate_game(home_players, away_players, arena="Home Arena", resimulate_id=None, is_season_game=False, season_id=None, favorite_team_boost=False):
+def _simulate_team(starters, bench, minutes_allocation, is_home_team, performance_boost, rng):
+    """Simulate stat lines for one team's players from their allocated minutes."""
+    team_stats = {}
+    
+    # Process all team players (starters and bench)
+    for player in starters + bench:
+        minutes = minutes_allocation[player.player_id]
+        
+        # Only create stats if player played minutes
+        if minutes > 0:
+            team_stats[player.player_id] = simulate_player_performance(
+                player,
+                minutes,
+                is_starter=player in starters,
+                is_home_team=is_home_team,
+                performance_boost=performance_boost,
+                rng=rng
+            )
+    
+    return team_stats
+
+def _split_lineup(players):
+    """
+    Split a list of players into starters (first five) and bench, each ordered
+    by player ID so a seed always replays the same draws for the same lineup.
+    """
+    starters = sorted(players[:5], key=lambda player: player.player_id)
+    bench = sorted(players[5:], key=lambda player: player.player_id)
+    
+    if len(starters) != 5:
+        raise ValueError("Need exactly 5 starters per team")
+    
+    return starters, bench
+
+# Seeds are stored in a signed 64-bit SQLite INTEGER and must stay below this
+SEED_LIMIT = 2 ** 63
+
+def new_game_seed():
+    """Draw a fresh 63-bit game seed (fits a SQLite INTEGER)"""
+    return random.getrandbits(63)
+
+def validate_seed(seed):
+    """Return seed if it is None or an int in [0, 2**63), otherwise raise ValueError"""
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or not 0 <= seed < SEED_LIMIT):
+        raise ValueError(f"Seed must be an integer from 0 to {SEED_LIMIT - 1}")
+    return seed
+
+def derive_seed(*parts):
+    """
+    Derive a 63-bit seed from a parent seed and labels, e.g.
+    derive_seed(season_seed, 'game', 12). The same parts always give the same
+    seed, and different parts give independent streams.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') >> 1
+
+def simulate_game_in_memory(home_players, away_players, favorite_team_boost=False, seed=None, performance_boost=None):
+    """
+    Simulate a game from preloaded players without touching the database.
+    
+    Parameters:
+    - home_players: list of PlayerRating for home team, first five are starters
+    - away_players: list of PlayerRating for away team, first five are starters
+    - favorite_team_boost: bool, whether to apply favorite team boost
+    - seed: int, seed for this game's own random.Random (a new one is drawn if None)
+    - performance_boost: float, overrides favorite_team_boost (used to replay stored games)
+    
+    Returns the same result dict as simulate_game with 'game_id' set to None
+    and the 'seed' and 'performance_boost' needed to replay it.
+    Pass it to save_game_result to persist it later.
+    """
+    home_starters, home_bench = _split_lineup(home_players)
+    away_starters, away_bench = _split_lineup(away_players)
+    
+    # Apply favorite team boost if needed
+    if performance_boost is None:
+        performance_boost = FAVORITE_TEAM_BOOST if favorite_team_boost else 1.0
+    
+    if seed is None:
+        seed = new_game_seed()
+    rng = random.Random(validate_seed(seed))
+    
+    # Allocate minutes for both teams
+    home_minutes = allocate_minutes(home_starters, home_bench, rng)
+    away_minutes = allocate_minutes(away_starters, away_bench, rng)
+    
+    # Simulate individual performances
+    home_stats = _simulate_team(home_starters, home_bench, home_minutes, True, performance_boost, rng)
+    away_stats = _simulate_team(away_starters, away_bench, away_minutes, False, performance_boost, rng)
+    
+    return {
+        'game_id': None,
+        'seed': seed,
+        'performance_boost': performance_boost,
+        'home_team': {
+            'team_id': home_starters[0].team_id,
+            'score': sum(stats.points for stats in home_stats.values()),
+            'players': home_stats
+        },
+        'away_team': {
+            'team_id': away_starters[0].team_id,
+            'score': sum(stats.points for stats in away_stats.values()),
+            'players': away_stats
+        }
+    }
+
+def _lineup_and_stat_rows(result, home_players, away_players):
+    """
+    Build GameLineup and PlayerGameStat column dicts (without game_id) for a simulated result.
+    Every player in the lineup gets a GameLineup row, so the game can be replayed
+    from its seed; only players who got minutes have stats.
+    """
+    lineup_rows = []
+    stat_rows = []
+    
+    for team_key, players in (('home_team', home_players), ('away_team', away_players)):
+        team_stats = result[team_key]['players']
+        starters = players[:5]
+        
+        for player in players:
+            stats = team_stats.get(player.player_id)
+            
+            lineup_rows.append({
+                'is_starter': player in starters,
+                'minutes_played': stats.minutes_played if stats else 0.0,
+                'team_id': player.team_id,
+                'player_id': player.player_id
+            })
+            if stats is not None:
+                stat_rows.append({
+                    'player_id': player.player_id,
+                    **stats.to_dict()
+                })
+    
+    return lineup_rows, stat_rows
+
+def _add_game_records(session, result, home_players, away_players, arena="Home Arena", resimulate_id=None, is_season_game=False, season_id=None, compact=False):
+    """
+    Add the Game, GameLineup and PlayerGameStat rows for a simulated result to a session.
+    With compact, stat lines are left out and replayed from the seed when read.
+    """
+    # Create or update game record
+    if resimulate_id:
+        game = session.query(Game).filter_by(game_id=resimulate_id).first()
+        if game:
+            # Take the old result out of the standings before replacing it
+            if game.home_team_score is not None and game.away_team_score is not None:
+                apply_game_results(session, [(game.home_team_id, game.away_team_id, game.home_team_score, game.away_team_score)], sign=-1)
+            game.resimulated = True
+            game.game_date = datetime.now().date()
+            game.game_time = datetime.now().time()
+        else:
+            raise ValueError(f"Game with ID {resimulate_id} not found")
+    else:
+        game = Game(
+            game_date=datetime.now().date(),
+            game_time=datetime.now().time(),
+            resimulated=False,
+            arena=arena,
+            home_team_id=result['home_team']['team_id'],
+            away_team_id=result['away_team']['team_id'],
+            is_season_game=is_season_game,
+            season_id=season_id
+        )
+        session.add(game)
+    
+    session.flush()
+    
+    lineup_rows, stat_rows = _lineup_and_stat_rows(result, home_players, away_players)
+    for lineup_row in lineup_rows:
+        session.add(GameLineup(game_id=game.game_id, **lineup_row))
+    if not compact:
+        for stat_row in stat_rows:
+            session.add(PlayerGameStat(game_id=game.game_id, **stat_row))
+    
+    # Update game score, and how to replay it
+    game.home_team_score = result['home_team']['score']
+    game.away_team_score = result['away_team']['score']
+    game.seed = result['seed']
+    game.performance_boost = result['performance_boost']
+    game.compact = compact
+    apply_game_results(session, [(game.home_team_id, game.away_team_id, game.home_team_score, game.away_team_score)])
+    
+    return game
+
+def _bump_game_versions(resimulate_id=None):
+    """Invalidate cached responses built from game data after a commit"""
+    if resimulate_id:
+        data_versions.bump('games', f'game:{resimulate_id}')
+    else:
+        data_versions.bump('games')
+
+def save_game_result(result, home_players, away_players, arena="Home Arena", resimulate_id=None, is_season_game=False, season_id=None, compact=False):
+    """
+    Persist a result from simulate_game_in_memory and return it with 'game_id' set.
+    
+    home_players and away_players must be the same Player records the result
+    was simulated from, in the same order. With compact, no stat lines are
+    stored (see replay_box_scores).
+    """
+    session = Session()
+    
+    try:
+        game = _add_game_records(
+            session, result, home_players, away_players,
+            arena=arena,
+            resimulate_id=resimulate_id,
+            is_season_game=is_season_game,
+            season_id=season_id,
+            compact=compact
+        )
+        session.commit()
+        _bump_game_versions(resimulate_id)
+        result['game_id'] = game.game_id
+        return result
+        
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+def simulate_game(home_players, away_players, arena="Home Arena", resimulate_id=None, is_season_game=False, season_id=None, favorite_team_boost=False, seed=None, compact=False):
     """
     Simulate a game with the selected players.
     
@@ -91,142 +337,362 @@ def simulate_game(home_players, away_players, arena="Home Arena", resimulate_id=
     - is_season_game: bool, whether this is part of season simulation
     - season_id: int, identifier for the season
     - favorite_team_boost: bool, whether to apply favorite team boost
+    - seed: int, RNG seed for the game (a new one is drawn if None); stored on the Game row
+    - compact: bool, store only the game and lineups; the box score is replayed when read
     """
     session = Session()
     
     try:
-        # Get player objects - all players, not just starters
-        home_starters = session.query(Player).filter(Player.player_id.in_(home_players[:5])).all()
-        home_bench = session.query(Player).filter(Player.player_id.in_(home_players[5:])).all()
-        away_starters = session.query(Player).filter(Player.player_id.in_(away_players[:5])).all()
-        away_bench = session.query(Player).filter(Player.player_id.in_(away_players[5:])).all()
+        # Get player ratings - all players, not just starters
+        home_starters = to_ratings(roster_cache.get_players(home_players[:5]))
+        home_bench = to_ratings(roster_cache.get_players(home_players[5:]))
+        away_starters = to_ratings(roster_cache.get_players(away_players[:5]))
+        away_bench = to_ratings(roster_cache.get_players(away_players[5:]))
 
         if not (home_starters and away_starters):
             raise ValueError("Could not find all selected players")
             
         if len(home_starters) != 5 or len(away_starters) != 5:
             raise ValueError("Need exactly 5 starters per team")
-        # Create or update game record
-        if resimulate_id:
-            game = session.query(Game).filter_by(game_id=resimulate_id).first()
-            if game:
-                game.resimulated = True
-                game.game_date = datetime.now().date()
-                game.game_time = datetime.now().time()
-            else:
-                raise ValueError(f"Game with ID {resimulate_id} not found")
-        else:
-            game = Game(
-                game_date=datetime.now().date(),
-                game_time=datetime.now().time(),
-                resimulated=False,
-                arena=arena,
-                home_team_id=home_starters[0].team_id,
-                away_team_id=away_starters[0].team_id,
-                is_season_game=is_season_game,
-                season_id=season_id
-            )
-            session.add(game)
         
-        session.flush()
+        if resimulate_id and not session.query(Game).filter_by(game_id=resimulate_id).first():
+            raise ValueError(f"Game with ID {resimulate_id} not found")
         
-        # Allocate minutes for both teams
-        home_minutes = allocate_minutes(home_starters, home_bench)
-        away_minutes = allocate_minutes(away_starters, away_bench)
+        result = simulate_game_in_memory(
+            home_starters + home_bench,
+            away_starters + away_bench,
+            favorite_team_boost=favorite_team_boost,
+            seed=seed
+        )
         
-        # Apply favorite team boost if needed
-        performance_boost = 1.05 if favorite_team_boost else 1.0
-        
-        # Simulate individual performances
-        home_stats = {}
-        away_stats = {}
-        
-        # Process all home team players (starters and bench)
-        for player in home_starters + home_bench:
-            is_starter = player in home_starters
-            minutes = home_minutes[player.player_id]
-            
-            # Only create stats if player played minutes
-            if minutes > 0:
-                lineup = GameLineup(
-                    is_starter=is_starter,
-                    minutes_played=minutes,
-                    game_id=game.game_id,
-                    team_id=player.team_id,
-                    player_id=player.player_id
-                )
-                session.add(lineup)
-                
-                stats = simulate_player_performance(
-                    player, 
-                    minutes,
-                    is_starter=is_starter,
-                    is_home_team=True,
-                    performance_boost=performance_boost if favorite_team_boost else 1.0
-                )
-                home_stats[player.player_id] = stats
-                
-                player_stats = PlayerGameStat(
-                    game_id=game.game_id,
-                    player_id=player.player_id,
-                    **stats
-                )
-    
-                session.add(player_stats)
-        
-        # Process all away team players (starters and bench)
-        for player in away_starters + away_bench:
-            is_starter = player in away_starters
-            minutes = away_minutes[player.player_id]
-            
-            if minutes > 0:
-                lineup = GameLineup(
-                    is_starter=is_starter,
-                    minutes_played=minutes,
-                    game_id=game.game_id,
-                    team_id=player.team_id,
-                    player_id=player.player_id
-                )
-                session.add(lineup)
-                
-                stats = simulate_player_performance(
-                    player, 
-                    minutes,
-                    is_starter=is_starter,
-                    is_home_team=False,
-                    performance_boost=performance_boost if favorite_team_boost else 1.0
-                )
-                away_stats[player.player_id] = stats
-                
-                player_stats = PlayerGameStat(
-                    game_id=game.game_id,
-                    player_id=player.player_id,
-                    **stats
-                )
-                session.add(player_stats)
-
-        # Update game score
-        game.home_team_score = sum(stats['points'] for stats in home_stats.values())
-        game.away_team_score = sum(stats['points'] for stats in away_stats.values())
+        game = _add_game_records(
+            session, result,
+            home_starters + home_bench,
+            away_starters + away_bench,
+            arena=arena,
+            resimulate_id=resimulate_id,
+            is_season_game=is_season_game,
+            season_id=season_id,
+            compact=compact
+        )
 
         session.commit()
+        _bump_game_versions(resimulate_id)
         
-        return {
-            'game_id': game.game_id,
-            'home_team': {
-                'team_id': home_starters[0].team_id,
-                'score': game.home_team_score,
-                'players': home_stats
-            },
-            'away_team': {
-                'team_id': away_starters[0].team_id,
-                'score': game.away_team_score,
-                'players': away_stats
-            }
-        }
+        result['game_id'] = game.game_id
+        return result
         
     except Exception as e:
         session.rollback()
         raise e
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+def replay_result(game, lineups):
+    """
+    Re-run a stored game from its seed and its GameLineup rows, without
+    writing anything, and return the result dict simulate_game produced.
+    
+    The replay is exact as long as the players' ratings have not changed
+    since the game was played. Raises ValueError if the game has no seed, a
+    player no longer exists or the lineups do not make up both teams.
+    """
+    if game.seed is None:
+        raise ValueError(f"Game {game.game_id} has no stored seed to replay")
+    
+    players = {player.player_id: player for player in roster_cache.get_players([lineup.player_id for lineup in lineups])}
+    sides = {game.home_team_id: ([], []), game.away_team_id: ([], [])}
+    for lineup in lineups:
+        player = players.get(lineup.player_id)
+        if player is None:
+            raise ValueError(f"Player {lineup.player_id} from game {game.game_id} no longer exists")
+        if lineup.team_id not in sides:
+            raise ValueError(f"Player {lineup.player_id} from game {game.game_id} is not on either team")
+        rating = PlayerRating.from_player(player)
+        rating.team_id = lineup.team_id  # The team they played for, even if traded since
+        starters, bench = sides[lineup.team_id]
+        (starters if lineup.is_starter else bench).append(rating)
+    
+    home_starters, home_bench = sides[game.home_team_id]
+    away_starters, away_bench = sides[game.away_team_id]
+    result = simulate_game_in_memory(
+        home_starters + home_bench,
+        away_starters + away_bench,
+        seed=game.seed,
+        performance_boost=game.performance_boost
+    )
+    result['game_id'] = game.game_id
+    return result
+
+def replay_game(game_id):
+    """Replay a stored game by ID (see replay_result)"""
+    session = Session()
+    try:
+        game = session.get(Game, game_id)
+        if not game:
+            raise ValueError(f"Game with ID {game_id} not found")
+        lineups = session.query(GameLineup).filter_by(game_id=game_id).order_by(GameLineup.lineup_id).all()
+        return replay_result(game, lineups)
+    finally:
+        session.close()
+
+def replay_box_scores(session, games):
+    """
+    Box scores of stored games, replayed from their seeds. Used for compact
+    games, which have no PlayerGameStat rows.
+    
+    Returns {game_id: [(team_id, player_id, StatLine), ...]} with the lines in
+    lineup order, for players who got minutes. Lineups of games not in
+    box_score_cache are loaded with one query.
+    
+    A replay only matches the stored game while the players' ratings are
+    unchanged, so the replayed points are checked against the stored score.
+    Games that can no longer be replayed (no seed, a deleted player, broken
+    lineups) or whose replay no longer adds up map to None (box score
+    unavailable), so one such game does not fail the others.
+    """
+    rosters_version = data_versions.get('rosters')
+    box_scores = {}
+    missing = {}
+    for game in games:
+        lines = box_score_cache.get((game.game_id, game.seed, rosters_version), _NOT_CACHED)
+        if lines is _NOT_CACHED:
+            missing[game.game_id] = game
+        else:
+            box_scores[game.game_id] = lines
+    
+    if missing:
+        game_lineups = {}
+        for lineup in session.query(GameLineup)\
+                .filter(GameLineup.game_id.in_(missing))\
+                .order_by(GameLineup.lineup_id):
+            game_lineups.setdefault(lineup.game_id, []).append(lineup)
+        
+        for game_id, game in missing.items():
+            lineups = game_lineups.get(game_id, [])
+            try:
+                result = replay_result(game, lineups)
+            except ValueError as e:
+                print(f"Cannot replay game {game_id}: {e}")
+                result = None
+            if result is None or (result['home_team']['score'], result['away_team']['score']) != (game.home_team_score, game.away_team_score):
+                lines = None
+            else:
+                stats = {**result['home_team']['players'], **result['away_team']['players']}
+                lines = [
+                    (lineup.team_id, lineup.player_id, stats[lineup.player_id])
+                    for lineup in lineups if lineup.player_id in stats
+                ]
+            box_score_cache.put((game_id, game.seed, rosters_version), lines)
+            box_scores[game_id] = lines
+    
+    return box_scores
+
+class BulkGameWriter:
+    """
+    Collect simulated games and write them in a single transaction.
+    
+    Writes the same rows as save_game_result, but all games, lineups and stat
+    lines go out as three executemany INSERTs instead of a flush and commit
+    per game. With compact, stat lines are left out.
+    """
+    
+    def __init__(self, compact=False):
+        self.compact = compact
+        self.pending = []
+    
+    def __len__(self):
+        return len(self.pending)
+    
+    def add(self, result, home_players, away_players, arena="Home Arena", is_season_game=False, season_id=None, game_date=None, game_time=None):
+        """Queue a result from simulate_game_in_memory for writing. Date and time default to now."""
+        now = datetime.now()
+        game_row = {
+            'game_date': game_date or now.date(),
+            'game_time': game_time or now.time(),
+            'resimulated': False,
+            'home_team_score': result['home_team']['score'],
+            'away_team_score': result['away_team']['score'],
+            'arena': arena,
+            'home_team_id': result['home_team']['team_id'],
+            'away_team_id': result['away_team']['team_id'],
+            'is_season_game': is_season_game,
+            'season_id': season_id,
+            'seed': result['seed'],
+            'performance_boost': result['performance_boost'],
+            'compact': self.compact
+        }
+        lineup_rows, stat_rows = _lineup_and_stat_rows(result, home_players, away_players)
+        if self.compact:
+            stat_rows = []
+        self.pending.append((result, game_row, lineup_rows, stat_rows))
+    
+    def write(self, session):
+        """
+        Insert all queued games in the session's transaction and set each
+        result's 'game_id'. The caller commits. Returns the written results.
+        """
+        if not self.pending:
+            return []
+        
+        game_ids = session.execute(
+            insert(Game.__table__).returning(Game.__table__.c.game_id, sort_by_parameter_order=True),
+            [game_row for _, game_row, _, _ in self.pending]
+        ).scalars().all()
+        
+        all_lineup_rows = []
+        all_stat_rows = []
+        for game_id, (result, _, lineup_rows, stat_rows) in zip(game_ids, self.pending):
+            result['game_id'] = game_id
+            all_lineup_rows.extend({'game_id': game_id, **row} for row in lineup_rows)
+            all_stat_rows.extend({'game_id': game_id, **row} for row in stat_rows)
+        
+        if all_lineup_rows:
+            session.execute(insert(GameLineup.__table__), all_lineup_rows)
+        if all_stat_rows:
+            session.execute(insert(PlayerGameStat.__table__), all_stat_rows)
+        
+        apply_game_results(session, [
+            (row['home_team_id'], row['away_team_id'], row['home_team_score'], row['away_team_score'])
+            for _, row, _, _ in self.pending
+        ])
+        
+        results = [result for result, _, _, _ in self.pending]
+        self.pending = []
+        return results
+
+def _average_lines(team_results, players, games):
+    """Per-player stat averages over games, counting games a player sat out as zeros"""
+    averages = []
+    for player in players:
+        lines = [result[player.player_id] for result in team_results if player.player_id in result]
+        averages.append({
+            'player_id': player.player_id,
+            'name': f"{player.first_name} {player.last_name}",
+            'games_played': len(lines),
+            'averages': {
+                field: round(sum(line[field] for line in lines) / games, 1)
+                for field in STAT_FIELDS
+            }
+        })
+    return averages
+
+def simulate_matchups(matchups, repetitions=1, seed=None, persist=False, compact=False):
+    """
+    Simulate each matchup repetitions times in memory and summarize the outcomes.
+    
+    Parameters:
+    - matchups: list of {'home_players': [ids], 'away_players': [ids]}, first five
+      IDs of each side are the starters; 'favorite_team_boost' is optional
+    - repetitions: int, games per matchup
+    - seed: int, seed the game seeds are derived from (a new one is drawn if None)
+    - persist: bool, also save every game, all in one transaction
+    - compact: bool, with persist, store games without stat lines
+    
+    Players are loaded once for the whole batch. Returns the seed, and per
+    matchup the win probabilities, average scores and average box scores
+    (plus 'game_ids' when persisted). Raises ValueError for invalid input.
+    """
+    if not isinstance(matchups, list) or not matchups:
+        raise ValueError("Need a list of at least one matchup")
+    if repetitions < 1:
+        raise ValueError("repetitions must be positive")
+    if len(matchups) * repetitions > MAX_BATCH_GAMES:
+        raise ValueError(f"At most {MAX_BATCH_GAMES} games per batch")
+    if validate_seed(seed) is None:
+        seed = new_game_seed()
+    
+    player_ids = set()
+    for index, matchup in enumerate(matchups):
+        if not isinstance(matchup, dict):
+            raise ValueError(f"Matchup {index} must be an object with home_players and away_players")
+        home_ids, away_ids = matchup.get('home_players'), matchup.get('away_players')
+        if not isinstance(home_ids, list) or not isinstance(away_ids, list) or len(home_ids) < 5 or len(away_ids) < 5:
+            raise ValueError("Need at least 5 players per team")
+        for side, ids in (('home', home_ids), ('away', away_ids)):
+            if len(set(ids)) != len(ids):
+                raise ValueError(f"Players listed more than once on the {side} side of matchup {index}")
+        both_sides = set(home_ids) & set(away_ids)
+        if both_sides:
+            raise ValueError(f"Players on both sides of matchup {index}: {sorted(both_sides)}")
+        player_ids.update(home_ids)
+        player_ids.update(away_ids)
+    snapshots = {player.player_id: player for player in roster_cache.get_players(player_ids)}
+    if len(snapshots) != len(player_ids):
+        raise ValueError(f"Players not found: {sorted(player_ids - snapshots.keys())}")
+    ratings = {player_id: PlayerRating.from_player(player) for player_id, player in snapshots.items()}
+    if persist:
+        # A saved game between a team and itself would corrupt the standings
+        for index, matchup in enumerate(matchups):
+            if ratings[matchup['home_players'][0]].team_id == ratings[matchup['away_players'][0]].team_id:
+                raise ValueError(f"Home and away teams of matchup {index} must differ to persist it")
+    
+    writer = BulkGameWriter(compact=compact) if persist else None
+    summaries = []
+    for index, matchup in enumerate(matchups):
+        home_players = [ratings[player_id] for player_id in matchup['home_players']]
+        away_players = [ratings[player_id] for player_id in matchup['away_players']]
+        home_team = roster_cache.get_team(home_players[0].team_id)
+        
+        results = []
+        for repetition in range(repetitions):
+            result = simulate_game_in_memory(
+                home_players,
+                away_players,
+                favorite_team_boost=bool(matchup.get('favorite_team_boost')),
+                seed=derive_seed(seed, 'matchup', index, 'game', repetition)
+            )
+            results.append(result)
+            if writer is not None:
+                writer.add(result, home_players, away_players, arena=home_team.arena if home_team else "Home Arena")
+        
+        home_scores = [result['home_team']['score'] for result in results]
+        away_scores = [result['away_team']['score'] for result in results]
+        home_wins = sum(home > away for home, away in zip(home_scores, away_scores))
+        ties = sum(home == away for home, away in zip(home_scores, away_scores))
+        summaries.append({
+            'home_team_id': results[0]['home_team']['team_id'],
+            'away_team_id': results[0]['away_team']['team_id'],
+            'games': repetitions,
+            'home_win_probability': home_wins / repetitions,
+            'away_win_probability': (repetitions - home_wins - ties) / repetitions,
+            'tie_probability': ties / repetitions,
+            'average_score': {
+                'home': round(sum(home_scores) / repetitions, 1),
+                'away': round(sum(away_scores) / repetitions, 1)
+            },
+            'home_players': _average_lines(
+                [result['home_team']['players'] for result in results],
+                [snapshots[player_id] for player_id in matchup['home_players']],
+                repetitions
+            ),
+            'away_players': _average_lines(
+                [result['away_team']['players'] for result in results],
+                [snapshots[player_id] for player_id in matchup['away_players']],
+                repetitions
+            ),
+            'results': results
+        })
+    
+    if writer is not None:
+        session = Session()
+        try:
+            writer.write(session)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        data_versions.bump('games')
+    
+    for summary in summaries:
+        results = summary.pop('results')
+        if persist:
+            summary['game_ids'] = [result['game_id'] for result in results]
+    
+    return {
+        'seed': seed,
+        'games_simulated': len(matchups) * repetitions,
+        'matchups': summaries
+    }
@@ -0,0 +1,137 @@
+# jobs.py
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+class JobCancelled(Exception):
+    """Raised inside a running job when it has been cancelled"""
+
+class JobQueueFull(Exception):
+    """Raised by JobManager.submit when too many jobs are already waiting"""
+
+class Job:
+    """A simulation running in the background, with progress tracking"""
+
+    def __init__(self, kind, total=None):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'queued'
+        self.total = total
+        self.completed = 0
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.future = None
+        self._cancel_event = threading.Event()
+
+    def report(self, completed, total=None):
+        """
+        Progress callback handed to the simulation. Raises JobCancelled once the
+        job has been cancelled so the simulation stops and rolls back.
+        """
+        self.completed = completed
+        if total is not None:
+            self.total = total
+        if self._cancel_event.is_set():
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+    def wait(self):
+        """Block until the job finishes and return its result"""
+        return self.future.result()
+
+    def to_dict(self):
+        """Job status for the /jobs endpoints"""
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        return {
+            'job_id': self.job_id,
+            'type': self.kind,
+            'status': self.status,
+            'completed': self.completed,
+            'total': self.total,
+            'elapsed_seconds': round(elapsed, 3),
+            'throughput': round(self.completed / elapsed, 2) if elapsed > 0 else 0.0,
+            'result': self.result,
+            'error': self.error
+        }
+
+class JobManager:
+    """
+    Runs simulation jobs on a fixed number of worker threads. Jobs beyond the
+    concurrency cap wait in the queue, up to max_queued of them. Only the most
+    recent finished jobs are kept so memory stays bounded.
+    """
+
+    def __init__(self, max_concurrent=2, max_finished=100, max_queued=16):
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='simulation')
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, total=None, **kwargs):
+        """
+        Queue fn(*args, progress=job.report, **kwargs) and return its Job.
+        fn should call progress(completed, total) as work finishes.
+        Raises JobQueueFull if max_queued jobs are already waiting.
+        """
+        job = Job(kind, total=total)
+        with self.lock:
+            unfinished = sum(1 for other in self.jobs.values() if other.status in ('queued', 'running'))
+            if unfinished >= self.max_concurrent + self.max_queued:
+                raise JobQueueFull(f"{self.max_queued} jobs are already waiting; try again later")
+            self.jobs[job.job_id] = job
+            self._prune()
+        job.future = self.executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        if job.status == 'cancelled':
+            return None
+        job.status = 'running'
+        job.started_at = time.time()
+        try:
+            job.result = fn(*args, progress=job.report, **kwargs)
+            job.status = 'completed'
+            return job.result
+        except JobCancelled:
+            job.status = 'cancelled'
+            raise
+        except Exception as e:
+            print(f"Error in job {job.job_id}: {e}")
+            job.status = 'failed'
+            job.error = str(e)
+            raise
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            return list(self.jobs.values())
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job. Returns the job, or None if unknown."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job.status in ('queued', 'running'):
+            job._cancel_event.set()
+            if job.future.cancel() or job.status == 'queued':
+                job.status = 'cancelled'
+                job.finished_at = time.time()
+        return job
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond max_finished"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in ('completed', 'failed', 'cancelled')]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
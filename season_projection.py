@@ -0,0 +1,213 @@
+# season_projection.py
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from caching import roster_cache
+from batch_simulator import ROSTER_FIELDS, build_roster_arrays, allocate_minutes_batch, simulate_player_performance_batch
+from season_simulator import favorite_schedule_counts, get_team_rotation, _simulation_order
+
+# Conference seeds that reach the playoffs directly, and the play-in range
+PLAYOFF_SEEDS = 6
+PLAY_IN_SEEDS = 10
+
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+def load_league(rotation_size=8):
+    """
+    Load every team's rotation into padded (n_teams, rotation_size) rating arrays.
+    Empty slots have zero ratings and never get minutes.
+    """
+    teams = sorted(roster_cache.get_teams(), key=lambda team: team.team_id)
+    rotations = [_simulation_order(get_team_rotation(team.team_id, rotation_size)) for team in teams]
+
+    roster = {field: np.zeros((len(teams), rotation_size)) for field in ROSTER_FIELDS}
+    for index, rotation in enumerate(rotations):
+        if len(rotation) < 5:
+            raise ValueError(f"{teams[index].city} {teams[index].team_name} has fewer than 5 players")
+        arrays = build_roster_arrays(rotation)
+        for field in ROSTER_FIELDS:
+            roster[field][index, :len(rotation)] = arrays[field]
+
+    conferences = sorted({team.conference for team in teams})
+    return {
+        'team_ids': np.array([team.team_id for team in teams]),
+        'names': [f"{team.city} {team.team_name}" for team in teams],
+        'conferences': np.array([conferences.index(team.conference) for team in teams]),
+        'bench_counts': np.array([len(rotation) - 5 for rotation in rotations]),
+        'roster': roster
+    }
+
+def _team_seasons(league, team_index, n_simulations, games_count, rng):
+    """
+    Simulate n_simulations schedules for one team, drawn like
+    generate_favorite_team_schedule. Returns (wins, points) arrays of shape (n_simulations,).
+    """
+    conferences = league['conferences']
+    roster = league['roster']
+    bench_counts = league['bench_counts']
+    rotation_size = roster['avg_points'].shape[1]
+
+    team_indices = np.arange(len(conferences))
+    conference_teams = team_indices[(conferences == conferences[team_index]) & (team_indices != team_index)]
+    other_teams = team_indices[conferences != conferences[team_index]]
+    home_conference, away_conference, home_other, away_other = favorite_schedule_counts(games_count)
+
+    # Opponents drawn with replacement, home games first, per simulated season
+    opponents = np.concatenate([
+        rng.choice(conference_teams, size=(n_simulations, home_conference + away_conference)),
+        rng.choice(other_teams, size=(n_simulations, home_other + away_other)),
+    ], axis=1).ravel()
+    is_home = np.tile(np.concatenate([
+        np.ones(home_conference, dtype=bool),
+        np.zeros(away_conference, dtype=bool),
+        np.ones(home_other, dtype=bool),
+        np.zeros(away_other, dtype=bool),
+    ]), n_simulations)
+    n_games = opponents.shape[0]
+
+    is_starter = np.arange(rotation_size) < 5
+    team_roster = {field: roster[field][team_index] for field in ROSTER_FIELDS}
+    opponent_roster = {field: roster[field][opponents] for field in ROSTER_FIELDS}
+
+    team_minutes = allocate_minutes_batch(np.full(n_games, bench_counts[team_index]), rng, rotation_size - 5)
+    opponent_minutes = allocate_minutes_batch(bench_counts[opponents], rng, rotation_size - 5)
+
+    team_scores = simulate_player_performance_batch(
+        team_roster, team_minutes, is_starter, is_home[:, None],
+        n_games=n_games, rng=rng, fields=('points',)
+    )['points'].sum(axis=1).reshape(n_simulations, -1)
+    opponent_scores = simulate_player_performance_batch(
+        opponent_roster, opponent_minutes, is_starter, ~is_home[:, None],
+        n_games=n_games, rng=rng, fields=('points',)
+    )['points'].sum(axis=1).reshape(n_simulations, -1)
+
+    wins = (team_scores > opponent_scores).sum(axis=1)
+    return wins, team_scores.sum(axis=1)
+
+def _project_chunk(league, conference_indices, n_simulations, games_count, seed_sequence):
+    """
+    Worker entry point: simulate n_simulations seasons for every team in a
+    conference. Returns (wins, seeds) arrays of shape (n_simulations, n_teams).
+    """
+    rng = np.random.default_rng(seed_sequence)
+
+    wins = np.zeros((n_simulations, len(conference_indices)), dtype=np.int64)
+    points = np.zeros((n_simulations, len(conference_indices)), dtype=np.int64)
+    for column, team_index in enumerate(conference_indices):
+        wins[:, column], points[:, column] = _team_seasons(league, team_index, n_simulations, games_count, rng)
+
+    # Seed by wins, then points scored, like the league standings
+    order = np.lexsort((-points, -wins), axis=-1)
+    seeds = np.argsort(order, axis=1) + 1
+    return wins, seeds
+
+def project_season(favorite_team_id, n_simulations=1000, seed=None, workers=None, games_count=82, chunk_size=250, progress=None):
+    """
+    Monte Carlo projection of a season for the favorite team.
+
+    Every team in the favorite team's conference plays n_simulations seasons
+    drawn like generate_favorite_team_schedule, simulated with the batch
+    engine. Simulations are split into fixed-size chunks, each with its own
+    seed spawned from seed, and spread over a process pool. Results depend
+    only on seed and n_simulations, not on the number of workers.
+
+    workers is clamped to 1..os.cpu_count() (all CPUs if None).
+    
+    progress, if given, is called as progress(simulations_completed, n_simulations)
+    after each chunk.
+
+    Returns win-total distribution, percentile bands and conference seed
+    probabilities for the favorite team, plus a conference summary.
+    """
+    favorite_team_id = int(favorite_team_id)
+    if n_simulations < 1:
+        raise ValueError("Need at least one simulation")
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+
+    league = load_league()
+    team_ids = list(league['team_ids'])
+    if favorite_team_id not in team_ids:
+        raise ValueError(f"Team {favorite_team_id} not found")
+
+    favorite_index = team_ids.index(favorite_team_id)
+    conference_indices = [
+        index for index in range(len(team_ids))
+        if league['conferences'][index] == league['conferences'][favorite_index]
+    ]
+
+    chunk_sizes = [min(chunk_size, n_simulations - start) for start in range(0, n_simulations, chunk_size)]
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    max_workers = os.cpu_count() or 1
+    workers = max_workers if workers is None else max(1, min(int(workers), max_workers))
+
+    chunks = []
+    if workers == 1 or len(chunk_sizes) == 1:
+        for size, seed_sequence in zip(chunk_sizes, seed_sequences):
+            chunks.append(_project_chunk(league, conference_indices, size, games_count, seed_sequence))
+            if progress:
+                progress(sum(chunk_sizes[:len(chunks)]), n_simulations)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunk_sizes))) as executor:
+            futures = [
+                executor.submit(_project_chunk, league, conference_indices, size, games_count, seed_sequence)
+                for size, seed_sequence in zip(chunk_sizes, seed_sequences)
+            ]
+            try:
+                # Collect in submission order so results don't depend on timing
+                for future in futures:
+                    chunks.append(future.result())
+                    if progress:
+                        progress(sum(chunk_sizes[:len(chunks)]), n_simulations)
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    wins = np.concatenate([chunk_wins for chunk_wins, _ in chunks])
+    seeds = np.concatenate([chunk_seeds for _, chunk_seeds in chunks])
+
+    games_per_season = sum(favorite_schedule_counts(games_count))
+    column = conference_indices.index(favorite_index)
+    favorite_wins = wins[:, column]
+    favorite_seeds = seeds[:, column]
+
+    conference = []
+    for index, team_index in enumerate(conference_indices):
+        conference.append({
+            'team_id': int(team_ids[team_index]),
+            'name': league['names'][team_index],
+            'mean_wins': round(float(wins[:, index].mean()), 2),
+            'p10_wins': float(np.percentile(wins[:, index], 10)),
+            'p90_wins': float(np.percentile(wins[:, index], 90)),
+            'playoff_probability': float((seeds[:, index] <= PLAYOFF_SEEDS).mean())
+        })
+    conference.sort(key=lambda team: team['mean_wins'], reverse=True)
+
+    return {
+        'team_id': favorite_team_id,
+        'name': league['names'][favorite_index],
+        'simulations': n_simulations,
+        'seed': seed,
+        'games_per_season': games_per_season,
+        'wins': {
+            'mean': round(float(favorite_wins.mean()), 2),
+            'std': round(float(favorite_wins.std()), 2),
+            'min': int(favorite_wins.min()),
+            'max': int(favorite_wins.max()),
+            'percentiles': {
+                f"p{p}": float(np.percentile(favorite_wins, p))
+                for p in PERCENTILES
+            }
+        },
+        # Index is the win total
+        'win_distribution': (np.bincount(favorite_wins, minlength=games_per_season + 1) / n_simulations).tolist(),
+        'seed_probabilities': {
+            str(position): float((favorite_seeds == position).mean())
+            for position in range(1, len(conference_indices) + 1)
+        },
+        'playoff_probability': float((favorite_seeds <= PLAYOFF_SEEDS).mean()),
+        'play_in_probability': float(((favorite_seeds > PLAYOFF_SEEDS) & (favorite_seeds <= PLAY_IN_SEEDS)).mean()),
+        'conference': conference
+    }
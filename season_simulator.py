@@ -1,11 +1,34 @@
 # season_simulator.py
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date, time
 import random
 import json
-from database_setup import Session, Team, Player
-from game_simulator import simulate_game
+from sqlalchemy import update, delete, select, func, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from database_setup import Session, Team, Player, Game, GameLineup, PlayerGameStat, PlayerSeasonTotal, team_totals_query
+from team_stats import apply_game_results
+from game_simulator import simulate_game, simulate_game_in_memory, BulkGameWriter, derive_seed, new_game_seed, validate_seed
+from caching import LRUCache, data_versions, roster_cache
+from simulation_types import to_ratings
 
-def generate_favorite_team_schedule(favorite_team_id, games_count=82):
+def favorite_schedule_counts(games_count=82):
+    """
+    Split a favorite team schedule into (home conference, away conference,
+    home non-conference, away non-conference) game counts
+    """
+    # Conference games (more frequent)
+    conference_games = games_count // 2  # About half the games should be conference games
+    
+    # Non-conference games
+    remaining_games = games_count - conference_games
+    
+    return conference_games // 2, conference_games // 2, remaining_games // 2, remaining_games // 2
+
+def generate_favorite_team_schedule(favorite_team_id, games_count=82, rng=None):
+    """
+    Draw the favorite team's opponents and home/away split, in random order.
+    rng is a random.Random to draw from (the global random module if None).
+    """
+    rng = rng or random
     session = Session()
     try:
         favorite_team = session.query(Team).get(favorite_team_id)
@@ -18,39 +41,515 @@ def generate_favorite_team_schedule(favorite_team_id, games_count=82):
         conference_teams = [team for team in all_teams if team.conference == favorite_team.conference]
         other_teams = [team for team in all_teams if team.conference != favorite_team.conference]
         
+        home_conference, away_conference, home_other, away_other = favorite_schedule_counts(games_count)
         schedule = []
         
-        # Conference games (more frequent)
-        conference_games = games_count // 2  # About half the games should be conference games
-        
         # Home conference games
-        for _ in range(conference_games // 2):
-            opponent = random.choice(conference_teams)
+        for _ in range(home_conference):
+            opponent = rng.choice(conference_teams)
             schedule.append((favorite_team_id, opponent.team_id))
             
         # Away conference games
-        for _ in range(conference_games // 2):
-            opponent = random.choice(conference_teams)
+        for _ in range(away_conference):
+            opponent = rng.choice(conference_teams)
             schedule.append((opponent.team_id, favorite_team_id))
             
-        # Non-conference games
-        remaining_games = games_count - conference_games
-        
         # Home non-conference games
-        for _ in range(remaining_games // 2):
-            opponent = random.choice(other_teams)
+        for _ in range(home_other):
+            opponent = rng.choice(other_teams)
             schedule.append((favorite_team_id, opponent.team_id))
             
         # Away non-conference games
-        for _ in range(remaining_games // 2):
-            opponent = random.choice(other_teams)
+        for _ in range(away_other):
+            opponent = rng.choice(other_teams)
             schedule.append((opponent.team_id, favorite_team_id))
             
-        random.shuffle(schedule)  # Randomize game order
+        rng.shuffle(schedule)  # Randomize game order
         return schedule
     finally:
         session.close()
-   
+
+# Tip-off times handed out to each day's games in order, one per game on the busiest day
+TIP_OFF_TIMES = [time(19, 0), time(19, 30), time(20, 0), time(20, 30), time(21, 0), time(22, 0), time(22, 30)]
+
+def _conference_divisions(teams):
+    """Group teams as {conference: [division team lists]} with divisions and teams in a fixed order"""
+    conferences = {}
+    for team in sorted(teams, key=lambda t: t.team_id):
+        conferences.setdefault(team.conference, {}).setdefault(team.division, []).append(team.team_id)
+    
+    if len(conferences) != 2 or any(
+        len(divisions) != 3 or any(len(members) != 5 for members in divisions.values())
+        for divisions in conferences.values()
+    ):
+        raise ValueError("League schedule needs 2 conferences of 3 five-team divisions")
+    
+    return {
+        conference: [divisions[name] for name in sorted(divisions)]
+        for conference, divisions in conferences.items()
+    }
+
+def _league_series(teams, season_year):
+    """
+    Build every pairing as (team_a, team_b, a_home_games, b_home_games) using the NBA format:
+    4 games against each division opponent, 3 or 4 games against the other ten
+    conference teams and 2 games against every team in the other conference.
+    """
+    conferences = _conference_divisions(teams)
+    series = []
+    
+    for divisions in conferences.values():
+        # Division opponents: 2 home, 2 away
+        for members in divisions:
+            for i, team_a in enumerate(members):
+                for team_b in members[i + 1:]:
+                    series.append((team_a, team_b, 2, 2))
+        
+        # Conference opponents in other divisions. Each team plays two teams from each
+        # of the other divisions only three times, rotating every season; it hosts
+        # one of those pairs twice and travels twice for the other.
+        rotation = season_year % 5
+        for i, division_a in enumerate(divisions):
+            for division_b in divisions[i + 1:]:
+                for k, team_a in enumerate(division_a):
+                    for l, team_b in enumerate(division_b):
+                        if l == (k + rotation) % 5:
+                            series.append((team_a, team_b, 2, 1))
+                        elif l == (k + rotation + 1) % 5:
+                            series.append((team_a, team_b, 1, 2))
+                        else:
+                            series.append((team_a, team_b, 2, 2))
+    
+    # Inter-conference: one home, one away
+    east, west = [
+        [team_id for members in divisions for team_id in members]
+        for divisions in conferences.values()
+    ]
+    for team_a in east:
+        for team_b in west:
+            series.append((team_a, team_b, 1, 1))
+    
+    return series
+
+def _assign_dates(games, start_date, max_games_per_day=len(TIP_OFF_TIMES)):
+    """
+    Spread (home_id, away_id) games over the calendar. A team plays at most once a
+    day and never three days in a row; teams with the most games left go first so
+    the season doesn't end with a long tail.
+    """
+    remaining = list(games)
+    games_left = {}
+    for home_id, away_id in remaining:
+        games_left[home_id] = games_left.get(home_id, 0) + 1
+        games_left[away_id] = games_left.get(away_id, 0) + 1
+    
+    last_played = {}  # team_id -> (day index, consecutive days played)
+    dated_games = []
+    day = 0
+    
+    while remaining:
+        game_date = start_date + timedelta(days=day)
+        todays_games = []
+        busy = set()
+        unscheduled = []
+        
+        remaining.sort(key=lambda g: games_left[g[0]] + games_left[g[1]], reverse=True)
+        for home_id, away_id in remaining:
+            available = len(todays_games) < max_games_per_day and home_id not in busy and away_id not in busy
+            for team_id in (home_id, away_id):
+                played_day, streak = last_played.get(team_id, (None, 0))
+                if played_day == day - 1 and streak >= 2:
+                    available = False
+            
+            if available:
+                todays_games.append((home_id, away_id))
+                busy.update((home_id, away_id))
+            else:
+                unscheduled.append((home_id, away_id))
+        
+        for home_id, away_id in todays_games:
+            dated_games.append((game_date, home_id, away_id))
+            for team_id in (home_id, away_id):
+                played_day, streak = last_played.get(team_id, (None, 0))
+                last_played[team_id] = (day, streak + 1 if played_day == day - 1 else 1)
+                games_left[team_id] -= 1
+        
+        remaining = unscheduled
+        day += 1
+    
+    return dated_games
+
+def generate_league_schedule(season_year=None, start_date=None, rng=None):
+    """
+    Generate a balanced 82-game schedule for all 30 teams (1,230 games).
+    
+    Returns a list of (game_date, game_time, home_team_id, away_team_id) tuples
+    in date order. The season starts on October 22 of season_year unless a
+    start_date is given. rng is a random.Random to shuffle with (the global
+    random module if None).
+    """
+    season_year = season_year or datetime.now().year
+    start_date = start_date or date(season_year, 10, 22)
+    
+    session = Session()
+    try:
+        teams = session.query(Team).all()
+    finally:
+        session.close()
+    
+    games = []
+    for team_a, team_b, a_home_games, b_home_games in _league_series(teams, season_year):
+        games.extend([(team_a, team_b)] * a_home_games)
+        games.extend([(team_b, team_a)] * b_home_games)
+    
+    (rng or random).shuffle(games)  # Randomize order before dates are handed out
+    
+    schedule = []
+    slot = 0
+    previous_date = None
+    for game_date, home_id, away_id in _assign_dates(games, start_date):
+        slot = slot + 1 if game_date == previous_date else 0
+        previous_date = game_date
+        schedule.append((game_date, TIP_OFF_TIMES[slot], home_id, away_id))
+    
+    return schedule
+
+def get_team_rotation(team_id, size=8):
+    """Get a team's top players by scoring average, as used for season games"""
+    return list(roster_cache.get_team_players(team_id)[:size])
+
+def _simulation_order(rotation):
+    """Order a rotation the way simulate_game loads it: starters, then bench, each by player ID"""
+    starters = sorted(rotation[:5], key=lambda p: p.player_id)
+    bench = sorted(rotation[5:], key=lambda p: p.player_id)
+    return starters + bench
+
+# Stat line keys summed into PlayerSeasonTotal
+SEASON_TOTAL_FIELDS = ('points', 'rebounds', 'assists', 'fgm', 'fga', 'minutes_played')
+
+def add_game_to_totals(totals, result, team_key, players):
+    """Add one team's stat lines from a simulated result to totals ({player_id: {field: value}})"""
+    team_ids = {player.player_id: player.team_id for player in players}
+    for player_id, stats in result[team_key]['players'].items():
+        if player_id not in team_ids:
+            continue
+        player_totals = totals.get(player_id)
+        if player_totals is None:
+            player_totals = totals[player_id] = dict.fromkeys(SEASON_TOTAL_FIELDS, 0)
+            player_totals['games'] = 0
+            player_totals['team_id'] = team_ids[player_id]
+        player_totals['games'] += 1
+        for field in SEASON_TOTAL_FIELDS:
+            player_totals[field] += getattr(stats, field)
+
+def save_player_season_totals(session, season_id, totals):
+    """
+    Add a batch of player totals to player_season_totals with one upsert,
+    then refresh those players' season_ppg/rpg/apg/games from the stored totals.
+    """
+    if not totals:
+        return
+    
+    statement = sqlite_insert(PlayerSeasonTotal)
+    statement = statement.on_conflict_do_update(
+        index_elements=['season_id', 'player_id'],
+        set_={
+            column: getattr(PlayerSeasonTotal, column) + getattr(statement.excluded, column)
+            for column in ('games',) + SEASON_TOTAL_FIELDS
+        }
+    )
+    session.execute(statement, [
+        {'season_id': season_id, 'player_id': player_id, **player_totals}
+        for player_id, player_totals in totals.items()
+    ])
+    
+    stored = session.query(PlayerSeasonTotal)\
+        .filter(PlayerSeasonTotal.season_id == season_id, PlayerSeasonTotal.player_id.in_(list(totals)))\
+        .all()
+    session.execute(update(Player), [
+        {
+            'player_id': row.player_id,
+            'season_games': row.games,
+            'season_ppg': row.ppg,
+            'season_rpg': row.rpg,
+            'season_apg': row.apg
+        }
+        for row in stored
+    ])
+
+def delete_season_games(session, season_id, team_id=None):
+    """
+    Delete a season's games (only those team_id played in, if given) with their
+    lineups and stat lines, and take them out of team_standings, in the
+    session's transaction. Returns the deleted game IDs.
+    
+    Re-simulating a season replaces its earlier games this way, just as its
+    player season totals are replaced, so the season's wins and the totals
+    the MVP race reads always come from the same run.
+    """
+    filters = [Game.season_id == season_id, Game.is_season_game == True]
+    if team_id is not None:
+        filters.append(or_(Game.home_team_id == team_id, Game.away_team_id == team_id))
+    games = session.execute(
+        select(Game.game_id, Game.home_team_id, Game.away_team_id, Game.home_team_score, Game.away_team_score)
+        .where(*filters)
+    ).all()
+    if not games:
+        return []
+    
+    apply_game_results(session, [
+        (game.home_team_id, game.away_team_id, game.home_team_score, game.away_team_score)
+        for game in games
+        if game.home_team_score is not None and game.away_team_score is not None
+    ], sign=-1)
+    game_ids = select(Game.game_id).where(*filters)
+    session.execute(delete(PlayerGameStat).where(PlayerGameStat.game_id.in_(game_ids)))
+    session.execute(delete(GameLineup).where(GameLineup.game_id.in_(game_ids)))
+    session.execute(delete(Game).where(*filters))
+    return [game.game_id for game in games]
+
+def simulate_favorite_team_season(favorite_team_id, games_count=82, progress=None, seed=None, compact=False):
+    """
+    Simulate a full season for the favorite team.
+    
+    Rosters are loaded once, games are simulated in memory and every game,
+    lineup and stat row is written in one transaction together with the
+    favorite team's record and player season totals.
+    
+    The schedule and every game draw from their own streams derived from
+    seed, so the same seed and rosters reproduce the season exactly. Each
+    game's seed is stored on its Game row. With compact, stat lines are not
+    stored and box scores are replayed from the seeds when read.
+    
+    The favorite team's earlier games in this season are replaced, together
+    with its players' season totals (see delete_season_games).
+    
+    progress, if given, is called as progress(games_completed, total_games)
+    after each game. Raising from it aborts the season without writing anything.
+    """
+    favorite_team_id = int(favorite_team_id)
+    if validate_seed(seed) is None:
+        seed = new_game_seed()
+    schedule = generate_favorite_team_schedule(
+        favorite_team_id,
+        games_count=games_count,
+        rng=random.Random(derive_seed(seed, 'schedule'))
+    )
+    season_id = datetime.now().year
+    
+    session = Session()
+    try:
+        teams = {team.team_id: team for team in session.query(Team).all()}
+        favorite_team = teams[favorite_team_id]
+        rotations = {}
+        
+        writer = BulkGameWriter(compact=compact)
+        season_wins = 0
+        season_losses = 0
+        player_totals = {}
+        
+        for game_number, (home_id, away_id) in enumerate(schedule, start=1):
+            for team_id in (home_id, away_id):
+                if team_id not in rotations:
+                    rotations[team_id] = to_ratings(_simulation_order(get_team_rotation(team_id)))
+            
+            home_players = rotations[home_id]
+            away_players = rotations[away_id]
+            
+            if len(home_players) < 5 or len(away_players) < 5:
+                continue
+            
+            # Every scheduled game involves the favorite team, so the boost always applies
+            result = simulate_game_in_memory(
+                home_players, away_players,
+                favorite_team_boost=True,
+                seed=derive_seed(seed, 'game', game_number)
+            )
+            
+            home_team = teams.get(home_id)
+            venue = home_team.arena if home_team else "Home Arena"
+            writer.add(result, home_players, away_players, arena=venue, is_season_game=True, season_id=season_id)
+            
+            # Update favorite team's record
+            is_favorite_home = home_id == favorite_team_id
+            favorite_won = (is_favorite_home and result['home_team']['score'] > result['away_team']['score']) or \
+                        (not is_favorite_home and result['away_team']['score'] > result['home_team']['score'])
+            
+            if favorite_won:
+                season_wins += 1
+            else:
+                season_losses += 1
+            
+            # Accumulate season totals for favorite team's players
+            team_key = 'home_team' if is_favorite_home else 'away_team'
+            team_players = home_players if is_favorite_home else away_players
+            add_game_to_totals(
+                player_totals, result, team_key,
+                [p for p in team_players if p.team_id == favorite_team_id]
+            )
+            
+            if progress:
+                progress(game_number, len(schedule))
+        
+        replaced_ids = delete_season_games(session, season_id, team_id=favorite_team_id)
+        results = writer.write(session)
+        
+        # Reset favorite team's player stats, then store this season's totals
+        session.query(Player)\
+            .filter_by(team_id=favorite_team_id)\
+            .update({
+                "season_ppg": 0.0,
+                "season_rpg": 0.0,
+                "season_apg": 0.0,
+                "season_games": 0
+            })
+        session.execute(delete(PlayerSeasonTotal).where(
+            PlayerSeasonTotal.season_id == season_id,
+            PlayerSeasonTotal.team_id == favorite_team_id
+        ))
+        save_player_season_totals(session, season_id, player_totals)
+        
+        favorite_team.season_wins = season_wins
+        favorite_team.season_losses = season_losses
+        favorite_team.avg_points = 0.0
+        favorite_team.win_rate = season_wins / (season_wins + season_losses) if results else 0.0
+        
+        session.commit()
+        data_versions.bump('season', 'games', *(f'game:{game_id}' for game_id in replaced_ids))
+        return results
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+def _rank_conferences(teams, standings):
+    """Order each conference by wins, then points scored, and number the seeds"""
+    conferences = {}
+    for team in sorted(teams.values(), key=lambda t: t.team_id):
+        conferences.setdefault(team.conference, []).append(team)
+    
+    ranked = {}
+    for conference, members in conferences.items():
+        members.sort(key=lambda t: (standings[t.team_id]['wins'], standings[t.team_id]['points']), reverse=True)
+        ranked[conference] = []
+        for seed, team in enumerate(members, start=1):
+            record = standings[team.team_id]
+            games_played = record['wins'] + record['losses']
+            ranked[conference].append({
+                'team_id': team.team_id,
+                'name': f"{team.city} {team.team_name}",
+                'division': team.division,
+                'wins': record['wins'],
+                'losses': record['losses'],
+                'win_rate': record['wins'] / games_played if games_played else 0.0,
+                'avg_points': record['points'] / games_played if games_played else 0.0,
+                'playoff_seed': seed
+            })
+    return ranked
+
+def simulate_league_season(season_id=None, schedule=None, progress=None, seed=None, compact=False):
+    """
+    Simulate a full 1,230-game season for all 30 teams.
+    
+    Rosters are loaded once and games are simulated in memory while standings
+    and player totals are kept incrementally. Games, team records, playoff seeds
+    and player season totals are written in one transaction.
+    
+    The generated schedule and every game draw from streams derived from seed,
+    so the same seed and rosters reproduce the season exactly. With compact,
+    stat lines are not stored and box scores are replayed when read. Earlier
+    games of the same season are replaced (see delete_season_games).
+    
+    progress, if given, is called as progress(games_completed, total_games)
+    after each game. Raising from it aborts the season without writing anything.
+    
+    Returns standings as {conference: [team records ordered by seed]}.
+    """
+    season_id = season_id or datetime.now().year
+    if validate_seed(seed) is None:
+        seed = new_game_seed()
+    schedule = schedule or generate_league_schedule(season_id, rng=random.Random(derive_seed(seed, 'schedule')))
+    
+    session = Session()
+    try:
+        teams = {team.team_id: team for team in session.query(Team).all()}
+        rotations = {
+            team_id: to_ratings(_simulation_order(get_team_rotation(team_id)))
+            for team_id in teams
+        }
+        
+        writer = BulkGameWriter(compact=compact)
+        standings = {team_id: {'wins': 0, 'losses': 0, 'points': 0} for team_id in teams}
+        player_totals = {}
+        
+        for game_number, (game_date, game_time, home_id, away_id) in enumerate(schedule, start=1):
+            home_players = rotations[home_id]
+            away_players = rotations[away_id]
+            
+            if len(home_players) < 5 or len(away_players) < 5:
+                continue
+            
+            result = simulate_game_in_memory(home_players, away_players, seed=derive_seed(seed, 'game', game_number))
+            writer.add(
+                result, home_players, away_players,
+                arena=teams[home_id].arena,
+                is_season_game=True,
+                season_id=season_id,
+                game_date=game_date,
+                game_time=game_time
+            )
+            
+            home_score = result['home_team']['score']
+            away_score = result['away_team']['score']
+            winner, loser = (home_id, away_id) if home_score > away_score else (away_id, home_id)
+            standings[winner]['wins'] += 1
+            standings[loser]['losses'] += 1
+            standings[home_id]['points'] += home_score
+            standings[away_id]['points'] += away_score
+            
+            add_game_to_totals(player_totals, result, 'home_team', home_players)
+            add_game_to_totals(player_totals, result, 'away_team', away_players)
+            
+            if progress:
+                progress(game_number, len(schedule))
+        
+        replaced_ids = delete_season_games(session, season_id)
+        writer.write(session)
+        ranked = _rank_conferences(teams, standings)
+        
+        session.execute(update(Team), [
+            {
+                'team_id': record['team_id'],
+                'season_wins': record['wins'],
+                'season_losses': record['losses'],
+                'win_rate': record['win_rate'],
+                'avg_points': record['avg_points'],
+                'playoff_seed': record['playoff_seed']
+            }
+            for records in ranked.values()
+            for record in records
+        ])
+        
+        # Reset every player's season stats, then store this season's totals
+        session.query(Player).update({
+            "season_ppg": 0.0,
+            "season_rpg": 0.0,
+            "season_apg": 0.0,
+            "season_games": 0
+        })
+        session.execute(delete(PlayerSeasonTotal).where(PlayerSeasonTotal.season_id == season_id))
+        save_player_season_totals(session, season_id, player_totals)
+        
+        session.commit()
+        data_versions.bump('season', 'games', *(f'game:{game_id}' for game_id in replaced_ids))
+        return ranked
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
 def get_team_season_mvp(team_id):
     """Get the MVP (best performer) from a specific team"""
     session = Session()
@@ -77,4 +576,95 @@ def get_team_season_mvp(team_id):
             
         return None
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+# League MVP score weights per game, plus a bonus per team win
+MVP_WEIGHTS = {'points': 1.0, 'rebounds': 0.8, 'assists': 1.2}
+MVP_WIN_BONUS = 0.1
+
+mvp_leaderboard_cache = LRUCache(max_entries=32)
+
+def get_mvp_leaderboard(limit=10, season_id=None):
+    """
+    League-wide MVP race: the top `limit` players by per-game points, rebounds
+    and assists plus a bonus per win their team had in that season, from
+    player_season_totals and the season's games.
+    
+    Scores, ranking and the limit are all computed in one joined SQL query.
+    Results are cached until a season simulation or a game change bumps the
+    'season' or 'games' data version.
+    
+    Parameters:
+    - limit: int, number of players to return
+    - season_id: int, season to rank (latest season with totals if None)
+    """
+    key = (data_versions.get('season'), data_versions.get('games'), season_id, limit)
+    cached = mvp_leaderboard_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    if season_id is None:
+        season = select(func.max(PlayerSeasonTotal.season_id)).scalar_subquery()
+    else:
+        season = season_id
+    season_filter = PlayerSeasonTotal.season_id == season
+    # Wins in the ranked season, not the teams' current records
+    team_totals = team_totals_query(season_id=season).subquery()
+    season_wins = func.coalesce(team_totals.c.wins, 0)
+    
+    ppg = PlayerSeasonTotal.points * 1.0 / PlayerSeasonTotal.games
+    rpg = PlayerSeasonTotal.rebounds * 1.0 / PlayerSeasonTotal.games
+    apg = PlayerSeasonTotal.assists * 1.0 / PlayerSeasonTotal.games
+    win_bonus = MVP_WIN_BONUS * season_wins
+    score = ppg * MVP_WEIGHTS['points'] + rpg * MVP_WEIGHTS['rebounds'] + apg * MVP_WEIGHTS['assists'] + win_bonus
+    
+    session = Session()
+    try:
+        rows = session.query(
+                PlayerSeasonTotal, Player, Team,
+                ppg.label('ppg'), rpg.label('rpg'), apg.label('apg'),
+                season_wins.label('season_wins'), win_bonus.label('win_bonus'), score.label('mvp_score')
+            )\
+            .join(Player, Player.player_id == PlayerSeasonTotal.player_id)\
+            .outerjoin(Team, Team.team_id == PlayerSeasonTotal.team_id)\
+            .outerjoin(team_totals, team_totals.c.team_id == PlayerSeasonTotal.team_id)\
+            .filter(season_filter, PlayerSeasonTotal.games > 0)\
+            .order_by(score.desc(), PlayerSeasonTotal.player_id)\
+            .limit(limit)\
+            .all()
+        
+        leaders = []
+        for rank, row in enumerate(rows, start=1):
+            totals, player, team = row.PlayerSeasonTotal, row.Player, row.Team
+            leaders.append({
+                'rank': rank,
+                'player_id': player.player_id,
+                'name': f"{player.first_name} {player.last_name}",
+                'position': player.position,
+                'team': {
+                    'team_id': team.team_id,
+                    'name': f"{team.city} {team.team_name}",
+                    'season_wins': row.season_wins
+                } if team else None,
+                'games': totals.games,
+                'ppg': round(row.ppg, 1),
+                'rpg': round(row.rpg, 1),
+                'apg': round(row.apg, 1),
+                'score': {
+                    'total': round(row.mvp_score, 2),
+                    'points': round(row.ppg * MVP_WEIGHTS['points'], 2),
+                    'rebounds': round(row.rpg * MVP_WEIGHTS['rebounds'], 2),
+                    'assists': round(row.apg * MVP_WEIGHTS['assists'], 2),
+                    'win_bonus': round(row.win_bonus, 2)
+                }
+            })
+        
+        leaderboard = {
+            'season_id': rows[0].PlayerSeasonTotal.season_id if rows else season_id,
+            'leaders': leaders
+        }
+    finally:
+        session.close()
+    
+    mvp_leaderboard_cache.put(key, leaderboard)
+    return leaderboard
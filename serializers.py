@@ -0,0 +1,86 @@
+# serializers.py
+import json
+import os
+from datetime import date, datetime, time
+from simulation_types import StatLine
+
+# orjson is several times faster, but its output is not byte-for-byte the same
+# as the json module's (see dumps), so it is only used when asked for with
+# NBA_JSON_BACKEND=orjson. By default responses are exactly what they were.
+orjson = None
+if os.environ.get('NBA_JSON_BACKEND', 'json').lower() == 'orjson':
+    try:
+        import orjson
+    except ImportError:
+        print("NBA_JSON_BACKEND=orjson but orjson is not installed; using the json module")
+
+JSON_BACKEND = 'orjson' if orjson else 'json'
+
+# What dumps puts between array items, for writers that build arrays piece by piece
+ARRAY_SEPARATOR = b',' if orjson else b', '
+
+_row_serializers = {}
+_model_serializers = {}
+
+def _compile(fields, accessor):
+    """
+    Generate a function that builds {field: value} for one row, with one
+    dict literal instead of a loop over the columns. accessor formats how a
+    value is read, e.g. 'obj.{name}' or 'obj[{index}]'.
+    """
+    items = ', '.join(
+        f'{name!r}: {accessor.format(name=name, index=index)}'
+        for index, name in enumerate(fields)
+    )
+    namespace = {}
+    exec(f'def serialize(obj):\n    return {{{items}}}', namespace)
+    return namespace['serialize']
+
+def row_serializer(model):
+    """
+    Serializer for tuples holding all of a model's columns in table order:
+    result rows of select(Model.__table__) and the roster cache snapshots.
+    """
+    serializer = _row_serializers.get(model)
+    if serializer is None:
+        fields = [column.name for column in model.__table__.columns]
+        serializer = _row_serializers[model] = _compile(fields, 'obj[{index}]')
+    return serializer
+
+def model_serializer(model):
+    """Serializer for ORM instances of model, reading every column attribute"""
+    serializer = _model_serializers.get(model)
+    if serializer is None:
+        fields = [column.name for column in model.__table__.columns]
+        serializer = _model_serializers[model] = _compile(fields, 'obj.{name}')
+    return serializer
+
+def _default(obj):
+    """Convert the values the JSON backends do not handle themselves"""
+    if isinstance(obj, StatLine):
+        return obj.to_dict()
+    if hasattr(type(obj), '__table__'):
+        return model_serializer(type(obj))(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, tuple):
+        # Named tuples, which the json module writes as arrays
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(data):
+    """
+    Serialize data to JSON bytes with the json module, or with orjson when
+    NBA_JSON_BACKEND=orjson and it is installed.
+    
+    The two backends decode to the same values but their bytes differ: orjson
+    leaves out the spaces after ', ' and ': ' and writes non-ASCII characters
+    as UTF-8 instead of \\u escapes. orjson only handles 64-bit integers, so
+    data it rejects goes to the json module instead.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(data, default=_default).encode()
@@ -1,27 +1,98 @@
 from http.server import HTTPServer, SimpleHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import json
 import os
-from database_setup import Session, Player, Team, Game, GameLineup, PlayerGameStat, get_all_teams
-from sqlalchemy.ext.declarative import DeclarativeMeta
+import threading
+from jobs import JobManager, JobQueueFull
+from caching import LRUCache, roster_cache, data_versions
+from compression import COMPRESSION_MIN_BYTES, StaticFileCache, compress, compressor, encoded_etag, negotiate_encoding
+from database_setup import Session, Player, Team, Game, GameLineup, PlayerGameStat
 from urllib.parse import parse_qs, urlparse
-from game_simulator import simulate_game
-from datetime import datetime, date, time
+from game_simulator import simulate_game, simulate_matchups, new_game_seed, validate_seed, replay_box_scores
+from serializers import ARRAY_SEPARATOR, dumps, row_serializer
 from sqlalchemy import or_, func
-from datetime import datetime, timedelta
-from team_stats import get_team_stats
+from team_stats import get_team_stats, apply_game_results
+from game_history import load_game_history, iter_game_history, decode_cursor
+from season_projection import project_season
 from season_simulator import (
-    generate_favorite_team_schedule, 
     get_team_season_mvp, 
+    get_mvp_leaderboard,
+    mvp_leaderboard_cache,
+    simulate_favorite_team_season,
+    simulate_league_season,
 )
 
 
-class DatabaseJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj.__class__, DeclarativeMeta):
-            return {c.name: getattr(obj, c.name) for c in obj.__table__.columns}
-        if isinstance(obj, (datetime, date, time)):
-            return obj.isoformat()
-        return super().default(obj)
+# Long simulations run as jobs on their own small pool so they never tie up
+# the threads that serve reads and static files
+SIMULATION_WORKERS = 2
+job_manager = JobManager(max_concurrent=SIMULATION_WORKERS)
+
+def _season_job(favorite_team_id, seed=None, compact=False, progress=None):
+    """Job body for an 82-game favorite team season"""
+    seed = new_game_seed() if seed is None else seed
+    results = simulate_favorite_team_season(favorite_team_id, games_count=82, progress=progress, seed=seed, compact=compact)
+    return {'success': True, 'favorite_team_id': int(favorite_team_id), 'games_simulated': len(results), 'seed': seed}
+
+def _league_job(season_id=None, seed=None, compact=False, progress=None):
+    """Job body for a full league season"""
+    seed = new_game_seed() if seed is None else seed
+    standings = simulate_league_season(season_id=season_id, progress=progress, seed=seed, compact=compact)
+    return {'success': True, 'standings': standings, 'seed': seed}
+
+def _projection_job(favorite_team_id, simulations=1000, seed=None, workers=None, progress=None):
+    """Job body for a Monte Carlo season projection"""
+    return project_season(favorite_team_id, n_simulations=simulations, seed=seed, workers=workers, progress=progress)
+
+def _validate_projection(params):
+    """Check projection parameters, raising ValueError for bad input"""
+    if not params.get('favorite_team_id'):
+        raise ValueError("Favorite team ID is required")
+    try:
+        simulations = int(params.get('simulations', 1000))
+    except (TypeError, ValueError):
+        raise ValueError("Simulations must be an integer")
+    if not 1 <= simulations <= 100000:
+        raise ValueError("Simulations must be between 1 and 100000")
+    workers = params.get('workers')
+    if workers is not None and (isinstance(workers, bool) or not isinstance(workers, int) or workers < 1):
+        raise ValueError("Workers must be a positive integer")
+
+def submit_job(job_type, params):
+    """Start a simulation job from request parameters. Raises ValueError for bad input."""
+    validate_seed(params.get('seed'))
+    if job_type == 'simulate_season':
+        if not params.get('favorite_team_id'):
+            raise ValueError("Favorite team ID is required")
+        return job_manager.submit(job_type, _season_job, params['favorite_team_id'], seed=params.get('seed'), compact=bool(params.get('compact')), total=82)
+    if job_type == 'simulate_league':
+        return job_manager.submit(job_type, _league_job, season_id=params.get('season_id'), seed=params.get('seed'), compact=bool(params.get('compact')), total=1230)
+    if job_type == 'project_season':
+        _validate_projection(params)
+        simulations = int(params.get('simulations', 1000))
+        return job_manager.submit(
+            job_type, _projection_job, params['favorite_team_id'],
+            simulations=simulations,
+            seed=params.get('seed'),
+            workers=params.get('workers'),
+            total=simulations
+        )
+    raise ValueError(f"Unknown job type: {job_type}")
+
+# Serialized read responses, keyed by path and the data versions they were built from
+RESPONSE_CACHE_BYTES = 16 * 1024 * 1024
+response_cache = LRUCache(max_entries=1024, max_bytes=RESPONSE_CACHE_BYTES)
+
+# Compressed copies of response bodies, keyed by (ETag, encoding)
+compressed_cache = LRUCache(max_entries=1024, max_bytes=RESPONSE_CACHE_BYTES // 2)
+
+# Streamed JSON is written to the socket in chunks of about this size
+STREAM_CHUNK_BYTES = 64 * 1024
+
+STATIC_PAGES = ('index.html', 'lineups.html', 'game_result.html', 'game_history.html',
+                'season_setup.html', 'season_results.html', 'single_game.html')
+static_files = StaticFileCache()
 
 class RequestHandler(SimpleHTTPRequestHandler):
     def do_GET(self):
@@ -40,55 +111,179 @@ class RequestHandler(SimpleHTTPRequestHandler):
             self._handle_team_info()
         elif path.startswith('/season_mvp/'):
             self._handle_season_mvp()
+        elif path == '/mvp_leaderboard':
+            self._handle_mvp_leaderboard()
         elif path.startswith('/game_result/'):
             self._handle_get_game_result()
         elif path.startswith('/team_schedule/'):
             self._handle_team_schedule()
+        elif path == '/jobs' or path.startswith('/jobs/'):
+            self._handle_get_job()
+        elif path == '/cache':
+            self._handle_cache_stats()
         # Handle static files
         elif path == '/':
             self._serve_file('index.html')
-        elif path in ['/index.html', '/lineups.html', '/game_result.html', 
-                    '/game_history.html', '/season_setup.html', '/season_results.html', '/single_game.html']:
+        elif path[1:] in STATIC_PAGES:
             self._serve_file(path[1:])
         else:
             self.send_error(404)
 
-    def _handle_get_teams(self):
-        """Handle /get_teams endpoint"""
+    def _response_cache_key(self, *versions):
+        """Cache key for this path at the current version of each named kind of data"""
+        return (self.path, tuple(data_versions.get(name) for name in versions))
+
+    def _send_cached(self, cache_key):
+        """Send the cached response for cache_key if there is one. Returns True if sent."""
+        cached = response_cache.get(cache_key)
+        if cached is None:
+            return False
+        etag, body = cached
+        self._send_json_body(etag, body)
+        return True
+
+    def _send_json(self, data, cache_key=None, headers=None):
+        """Serialize data and send it with an ETag, keeping the body under cache_key if given"""
+        body = dumps(data)
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if cache_key is not None:
+            response_cache.put(cache_key, (etag, body), size=len(body))
+        self._send_json_body(etag, body, headers=headers)
+
+    def _send_json_body(self, etag, body, headers=None):
+        """
+        Send a JSON body, gzip or deflate compressed if the client accepts it
+        and the body is at least COMPRESSION_MIN_BYTES. Compressed copies are
+        kept in compressed_cache, so a cached response is compressed once.
+        """
+        encoding = None
+        if len(body) >= COMPRESSION_MIN_BYTES:
+            encoding = negotiate_encoding(self.headers.get('Accept-Encoding'))
+        if encoding is not None:
+            compressed = compressed_cache.get((etag, encoding))
+            if compressed is None:
+                compressed = compress(body, encoding)
+                compressed_cache.put((etag, encoding), compressed, size=len(compressed))
+            body = compressed
+        self._send_body(body, 'application/json', encoded_etag(etag, encoding), encoding, headers=headers)
+
+    def _send_body(self, body, content_type, etag, encoding=None, headers=None):
+        """
+        Send a complete response body with its ETag and Content-Length, or
+        304 Not Modified if the client's If-None-Match has this ETag.
+        encoding is the Content-Encoding body is already in, if any.
+        """
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            client_tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            if etag in client_tags or '*' in client_tags:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Vary', 'Accept-Encoding')
+                self.end_headers()
+                return
+        
+        self.send_response(200)
+        if content_type:
+            self.send_header('Content-type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if encoding is not None:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json_stream(self, items, headers=None):
+        """
+        Send an iterable as a JSON array, encoding items as they arrive instead
+        of building the whole body first. HTTP/1.1 clients get chunked transfer
+        encoding; HTTP/1.0 clients get a body ended by closing the connection.
+        
+        The stream is compressed on the fly if the client accepts gzip or deflate.
+        
+        Headers go out before the first item is read, so an error while
+        iterating can only cut the response short. It is logged, not raised.
+        """
+        chunked = self.request_version == 'HTTP/1.1'
+        if chunked:
+            # Only this response is HTTP/1.1; the connection still closes after it
+            self.protocol_version = 'HTTP/1.1'
+        encoding = negotiate_encoding(self.headers.get('Accept-Encoding'))
+        stream_compressor = compressor(encoding) if encoding else None
+        
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if encoding is not None:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Connection', 'close')
         self.end_headers()
         
-        teams = get_all_teams()
-        teams_json = json.dumps(teams, cls=DatabaseJSONEncoder)
-        self.wfile.write(teams_json.encode())
+        def write(data, final=False):
+            if stream_compressor is not None:
+                data = stream_compressor.compress(data)
+                if final:
+                    data += stream_compressor.flush()
+            if not data:
+                return
+            if chunked:
+                self.wfile.write(b'%X\r\n%s\r\n' % (len(data), data))
+            else:
+                self.wfile.write(data)
+        
+        buffer = bytearray(b'[')
+        try:
+            for index, item in enumerate(items):
+                if index:
+                    buffer += ARRAY_SEPARATOR
+                buffer += dumps(item)
+                if len(buffer) >= STREAM_CHUNK_BYTES:
+                    write(bytes(buffer))
+                    buffer.clear()
+            buffer += b']'
+            write(bytes(buffer), final=True)
+            if chunked:
+                self.wfile.write(b'0\r\n\r\n')
+        except Exception as e:
+            print(f"Error streaming response: {str(e)}")
+
+    def _handle_get_teams(self):
+        """Handle /get_teams endpoint"""
+        cache_key = self._response_cache_key('rosters', 'season')
+        if self._send_cached(cache_key):
+            return
+        
+        teams = roster_cache.get_teams()
+        serialize = row_serializer(Team)
+        self._send_json([serialize(team) for team in teams], cache_key=cache_key)
 
     def _handle_get_team_players(self):
         """Handle /get_team_players/<team_id> endpoint"""
         try:
             team_id = int(self.path.split('/')[-1])
-            session = Session()
-            
-            # Modified query to order players by average points descending
-            players = session.query(Player)\
-                .filter_by(team_id=team_id)\
-                .order_by(Player.avg_points.desc())\
-                .all()
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
+            cache_key = self._response_cache_key('rosters', 'season')
+            if self._send_cached(cache_key):
+                return
             
-            players_json = json.dumps(players, cls=DatabaseJSONEncoder)
-            self.wfile.write(players_json.encode())
+            # Players ordered by average points descending
+            players = roster_cache.get_team_players(team_id)
+            serialize = row_serializer(Player)
+            self._send_json([serialize(player) for player in players], cache_key=cache_key)
         except ValueError as e:
             print(f"Invalid team ID: {str(e)}")
             self.send_error(400, "Invalid team ID")
         except Exception as e:
             print(f"Error getting team players: {str(e)}")
             self.send_error(500, str(e))
-        finally:
-            session.close()
 
     def _handle_team_stats(self):
         """Handle /team_stats/<team_id> endpoint"""
@@ -103,94 +298,50 @@ class RequestHandler(SimpleHTTPRequestHandler):
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps(stats, cls=DatabaseJSONEncoder).encode())
+            self.wfile.write(dumps(stats))
         except Exception as e:
             print(f"Error getting team stats: {str(e)}")
             self.send_error(500, str(e))
             
     def _handle_get_games(self):
-        """Handle /get_games endpoint"""
+        """
+        Handle /get_games endpoint.
+        
+        Optional query parameters: limit and cursor for keyset pagination (the next
+        cursor comes back in the X-Next-Cursor header), since=<game_id> for games
+        created after that one, after=<cursor> for games created or resimulated
+        after the game with that cursor, and summary=1 to leave out player box scores.
+        Without a limit, games are streamed as they are read.
+        """
+        try:
+            query = parse_qs(urlparse(self.path).query)
+            limit = int(query['limit'][0]) if 'limit' in query else None
+            cursor = query['cursor'][0] if 'cursor' in query else None
+            since = int(query['since'][0]) if 'since' in query else None
+            after = query['after'][0] if 'after' in query else None
+            summary = query.get('summary', ['0'])[0] in ('1', 'true')
+            
+            if limit is not None and limit < 1:
+                raise ValueError("limit must be positive")
+            if cursor is not None:
+                decode_cursor(cursor)
+            if after is not None:
+                decode_cursor(after)
+        except ValueError as e:
+            print(f"Invalid game history parameters: {str(e)}")
+            self.send_error(400, "Invalid game history parameters")
+            return
+        
         session = Session()
         try:
-            games = session.query(Game)\
-            .filter(Game.is_season_game == False)\
-            .order_by(Game.game_date.desc(), Game.game_time.desc())\
-            .all()
-            results = []
+            if limit is None:
+                self._send_json_stream(iter_game_history(session, cursor=cursor, since=since, after=after, summary=summary))
+                return
             
-            for game in games:
-                home_team = session.get(Team, game.home_team_id)
-                away_team = session.get(Team, game.away_team_id)
-                
-                home_stats = session.query(PlayerGameStat, Player).join(Player).filter(
-                    PlayerGameStat.game_id == game.game_id,
-                    Player.team_id == game.home_team_id
-                ).all()
-                
-                away_stats = session.query(PlayerGameStat, Player).join(Player).filter(
-                    PlayerGameStat.game_id == game.game_id,
-                    Player.team_id == game.away_team_id
-                ).all()
-                
-                game_data = {
-                    'game': {
-                        'game_id': game.game_id,
-                        'home_score': game.home_team_score,
-                        'away_score': game.away_team_score,
-                        'date': game.game_date,
-                        'time': game.game_time,
-                        'arena': game.arena,
-                        'resimulated': game.resimulated
-                    },
-                    'home_team': {
-                        'team_id': home_team.team_id,
-                        'name': f"{home_team.city} {home_team.team_name}",
-                        'players': [{
-                            'name': f"{player.first_name} {player.last_name}",
-                            'position': player.position,
-                            'jersey_number': player.jersey_number,
-                            'stats': {
-                                'points': stat.points,
-                                'rebounds': stat.rebounds,
-                                'assists': stat.assists,
-                                'steals': stat.steals,
-                                'blocks': stat.blocks,
-                                'turnovers': stat.turnovers,
-                                'fouls': stat.fouls,
-                                'fgm': stat.fgm,
-                                'fga': stat.fga,
-                                'minutes': stat.minutes_played
-                            }
-                        } for stat, player in home_stats]
-                    },
-                    'away_team': {
-                        'team_id': away_team.team_id,
-                        'name': f"{away_team.city} {away_team.team_name}",
-                        'players': [{
-                            'name': f"{player.first_name} {player.last_name}",
-                            'position': player.position,
-                            'jersey_number': player.jersey_number,
-                            'stats': {
-                                'points': stat.points,
-                                'rebounds': stat.rebounds,
-                                'assists': stat.assists,
-                                'steals': stat.steals,
-                                'blocks': stat.blocks,
-                                'turnovers': stat.turnovers,
-                                'fouls': stat.fouls,
-                                'fgm': stat.fgm,
-                                'fga': stat.fga,
-                                'minutes': stat.minutes_played
-                            }
-                        } for stat, player in away_stats]
-                    }
-                }
-                results.append(game_data)
+            results, next_cursor = load_game_history(session, limit=limit, cursor=cursor, since=since, after=after, summary=summary)
             
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(results, cls=DatabaseJSONEncoder).encode())
+            headers = {'X-Next-Cursor': str(next_cursor)} if next_cursor is not None else None
+            self._send_json(results, headers=headers)
             
         except Exception as e:
             print(f"Error getting games: {str(e)}")
@@ -261,7 +412,8 @@ class RequestHandler(SimpleHTTPRequestHandler):
             print(f"Error getting team schedule: {e}")
             self.send_error(500, str(e))
         finally:
-            session.close()
+            if 'session' in locals():
+                session.close()
 
     def _handle_get_game_lineups(self):
         """Handle /get_game_lineups/<game_id> endpoint"""
@@ -294,18 +446,24 @@ class RequestHandler(SimpleHTTPRequestHandler):
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps(result, cls=DatabaseJSONEncoder).encode())
+            self.wfile.write(dumps(result))
 
         except Exception as e:
             print(f"Error getting game lineups: {str(e)}")
             self.send_error(500, str(e))
         finally:
-            session.close()
+            if 'session' in locals():
+                session.close()
 
     def _handle_get_game_result(self):
         """Handle /game_result/<game_id> endpoint"""
         try:
             game_id = int(self.path.split('/')[-1])
+            # A finished game only changes when it is resimulated or deleted
+            cache_key = self._response_cache_key('rosters', f'game:{game_id}')
+            if self._send_cached(cache_key):
+                return
+            
             session = Session()
             
             game = session.get(Game, game_id)
@@ -313,15 +471,29 @@ class RequestHandler(SimpleHTTPRequestHandler):
                 self.send_error(404, "Game not found")
                 return
 
-            home_stats = session.query(PlayerGameStat, Player).join(Player).filter(
-                PlayerGameStat.game_id == game_id,
-                Player.team_id == game.home_team_id
-            ).all()
-            
-            away_stats = session.query(PlayerGameStat, Player).join(Player).filter(
-                PlayerGameStat.game_id == game_id,
-                Player.team_id == game.away_team_id
-            ).all()
+            box_score_available = True
+            if game.compact:
+                # No stored stat lines; replay the box score from the game's seed
+                lines = replay_box_scores(session, [game])[game_id]
+                if lines is None:
+                    # Ratings changed since the game was played; the replay no longer matches its score
+                    box_score_available = False
+                    lines = []
+                players = {player.player_id: player for player in roster_cache.get_players(
+                    [player_id for _, player_id, _ in lines]
+                )}
+                home_stats = [(stat, players[player_id]) for team_id, player_id, stat in lines if team_id == game.home_team_id]
+                away_stats = [(stat, players[player_id]) for team_id, player_id, stat in lines if team_id == game.away_team_id]
+            else:
+                home_stats = session.query(PlayerGameStat, Player).join(Player).filter(
+                    PlayerGameStat.game_id == game_id,
+                    Player.team_id == game.home_team_id
+                ).all()
+                
+                away_stats = session.query(PlayerGameStat, Player).join(Player).filter(
+                    PlayerGameStat.game_id == game_id,
+                    Player.team_id == game.away_team_id
+                ).all()
             
             home_team = session.get(Team, game.home_team_id)
             away_team = session.get(Team, game.away_team_id)
@@ -334,7 +506,8 @@ class RequestHandler(SimpleHTTPRequestHandler):
                     'date': game.game_date,
                     'time': game.game_time,
                     'arena': game.arena,
-                    'resimulated': game.resimulated
+                    'resimulated': game.resimulated,
+                    'box_score_available': box_score_available
                 },
                 'home_team': {
                     'team_id': home_team.team_id,
@@ -380,10 +553,7 @@ class RequestHandler(SimpleHTTPRequestHandler):
                 }
             }
 
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(result, cls=DatabaseJSONEncoder).encode())
+            self._send_json(result, cache_key=cache_key)
             
         except Exception as e:
             print(f"Error in _handle_get_game_result: {str(e)}")
@@ -392,175 +562,186 @@ class RequestHandler(SimpleHTTPRequestHandler):
             if 'session' in locals():
                 session.close()
     
-    def _handle_season_mvp(self):
-        """Handle GET request for season MVP data"""
-        session = Session()
+    def _handle_cache_stats(self):
+        """Handle GET /cache: hit/miss counters for the in-process caches"""
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps({
+            'rosters': roster_cache.stats(),
+            'mvp_leaderboard': mvp_leaderboard_cache.stats(),
+            'responses': response_cache.stats(),
+            'compressed_responses': compressed_cache.stats()
+        }).encode())
+
+    def _handle_invalidate_cache(self):
+        """Handle DELETE /cache, e.g. after populate_nba_players.py has run against a live server"""
+        roster_cache.invalidate()
+        data_versions.bump('season', 'games')
+        response_cache.clear()
+        compressed_cache.clear()
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps({'success': True}).encode())
+
+    def _handle_mvp_leaderboard(self):
+        """Handle /mvp_leaderboard?limit=<k>&season_id=<id> endpoint"""
         try:
-            # Get all players with season stats
-            players = session.query(Player)\
-                .filter(Player.season_games > 0)\
-                .all()
-            
-            # Default MVP data
-            mvp_data = {
-                'name': "No MVP Yet",
-                'ppg': 0.0,
-                'rpg': 0.0,
-                'apg': 0.0,
-                'mvp_score': 0.0,
-            }
+            query = parse_qs(urlparse(self.path).query)
+            limit = int(query.get('limit', ['10'])[0])
+            season_id = int(query['season_id'][0]) if 'season_id' in query else None
+            if not 1 <= limit <= 100:
+                raise ValueError("limit must be between 1 and 100")
+        except ValueError as e:
+            self.send_error(400, str(e))
+            return
+        
+        try:
+            leaderboard = get_mvp_leaderboard(limit=limit, season_id=season_id)
             
-            if players:
-                # Calculate MVP score for each player
-                mvp_candidates = []
-                for player in players:
-                    team = session.query(Team).get(player.team_id)
-                    win_bonus = 0.1 * (team.season_wins if team else 0)
-                    
-                    mvp_score = (player.season_ppg * 1.0 + 
-                                player.season_rpg * 0.8 + 
-                                player.season_apg * 1.2 + 
-                                win_bonus)
-                    
-                    mvp_candidates.append((player, mvp_score))
-                
-                # Sort by MVP score and get the top player
-                if mvp_candidates:
-                    mvp_candidates.sort(key=lambda x: x[1], reverse=True)
-                    mvp_player, mvp_score = mvp_candidates[0]
-                    
-                    mvp_data = {
-                        'name': f"{mvp_player.first_name} {mvp_player.last_name}",
-                        'ppg': player.season_ppg,
-                        'rpg': player.season_rpg,
-                        'apg': player.season_apg,
-                        'mvp_score': mvp_score,
-                    }
-            
-            self.send_response(200)  # Always send 200, even if no MVP yet
+            self.send_response(200)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps(mvp_data).encode())
-            
+            self.wfile.write(json.dumps(leaderboard).encode())
         except Exception as e:
-            print(f"Error getting MVP data: {e}")
+            print(f"Error getting MVP leaderboard: {e}")
             self.send_error(500, str(e))
-        finally:
-            session.close()
+
+    def _handle_simulate_games(self):
+        """
+        Handle POST /simulate_games: many games in one request.
+        
+        Body is {"matchups": [{"home_players": [...], "away_players": [...]}, ...]}
+        or a single {"home_players": [...], "away_players": [...]}, plus optional
+        "repetitions" (games per matchup), "seed", "persist" (save every game in
+        one transaction) and "compact". Replies with win probabilities, average
+        scores and average box scores per matchup.
+        """
+        try:
+            content_length = int(self.headers.get('Content-Length') or 0)
+            batch_data = json.loads(self.rfile.read(content_length).decode('utf-8') or '{}')
+            matchups = batch_data.get('matchups') or [{
+                'home_players': batch_data.get('home_players'),
+                'away_players': batch_data.get('away_players'),
+                'favorite_team_boost': batch_data.get('favorite_team_boost')
+            }]
+            repetitions = batch_data.get('repetitions', 1)
+            if isinstance(repetitions, bool) or not isinstance(repetitions, int):
+                raise ValueError("Repetitions must be an integer")
+            result = simulate_matchups(
+                matchups,
+                repetitions=repetitions,
+                seed=batch_data.get('seed'),
+                persist=bool(batch_data.get('persist')),
+                compact=bool(batch_data.get('compact'))
+            )
+        except (ValueError, TypeError, KeyError) as e:
+            print(f"Invalid simulate_games request: {e}")
+            self.send_error(400, str(e))
+            return
+        except Exception as e:
+            print(f"Error simulating games: {e}")
+            self.send_error(500, str(e))
+            return
+        
+        self._send_json(result)
 
     def _handle_simulate_season(self):
         """Handle POST request to simulate a full season"""
         content_length = int(self.headers['Content-Length'])
         post_data = self.rfile.read(content_length)
         season_data = json.loads(post_data.decode('utf-8'))
+        self._run_job('simulate_season', season_data)
+
+    def _run_job(self, job_type, params):
+        """
+        Start a simulation job. With "background": true in the request, reply 202
+        with the job to poll at /jobs/<id>; otherwise wait and reply with the result.
+        """
+        try:
+            job = submit_job(job_type, params)
+        except (ValueError, TypeError) as e:
+            print(f"Invalid {job_type} request: {e}")
+            self.send_error(400, str(e))
+            return
+        except JobQueueFull as e:
+            print(f"Rejected {job_type} request: {e}")
+            self.send_error(503, str(e))
+            return
         
-        favorite_team_id = season_data.get('favorite_team_id')
-        
-        if not favorite_team_id:
-            self.send_error(400, "Favorite team ID is required")
+        if params.get('background'):
+            self.send_response(202)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Location', f"/jobs/{job.job_id}")
+            self.end_headers()
+            self.wfile.write(json.dumps(job.to_dict()).encode())
             return
         
-        session = Session()
         try:
-            # Generate schedule for favorite team
-            schedule = generate_favorite_team_schedule(favorite_team_id, games_count=82)
-            season_id = datetime.now().year
-            
-            # Reset stats for favorite team
-            favorite_team = session.query(Team).get(favorite_team_id)
-            if favorite_team:
-                favorite_team.season_wins = 0
-                favorite_team.season_losses = 0
-                favorite_team.win_rate = 0.0
-                favorite_team.avg_points = 0.0
-                
-                # Reset stats for favorite team's players
-                session.query(Player)\
-                    .filter_by(team_id=favorite_team_id)\
-                    .update({
-                        "season_ppg": 0.0,
-                        "season_rpg": 0.0,
-                        "season_apg": 0.0,
-                        "season_games": 0
-                    })
-                
-                session.commit()
-            
-            results = []
-            for home_id, away_id in schedule:
-                # Get players for simulation
-                home_players = session.query(Player)\
-                    .filter_by(team_id=home_id)\
-                    .order_by(Player.avg_points.desc())\
-                    .limit(8).all()
-                    
-                away_players = session.query(Player)\
-                    .filter_by(team_id=away_id)\
-                    .order_by(Player.avg_points.desc())\
-                    .limit(8).all()
-                
-                if len(home_players) >= 5 and len(away_players) >= 5:
-                    home_lineup = [p.player_id for p in home_players]
-                    away_lineup = [p.player_id for p in away_players]
-                    
-                    # Apply favorite team boost
-                    boost_home = str(home_id) == str(favorite_team_id)
-                    boost_away = str(away_id) == str(favorite_team_id)
-                    
-                    # Get home team arena
-                    home_team = session.query(Team).get(home_id)
-                    venue = home_team.arena if home_team else "Home Arena"
-                    
-                    # Simulate game
-                    result = simulate_game(
-                        home_lineup,
-                        away_lineup,
-                        arena=venue,
-                        is_season_game=True,
-                        season_id=season_id,
-                        favorite_team_boost=boost_home or boost_away
-                    )
-                    
-                    # Update favorite team's record
-                    is_favorite_home = str(home_id) == str(favorite_team_id)
-                    favorite_won = (is_favorite_home and result['home_team']['score'] > result['away_team']['score']) or \
-                                (not is_favorite_home and result['away_team']['score'] > result['home_team']['score'])
-                    
-                    if favorite_won:
-                        favorite_team.season_wins += 1
-                    else:
-                        favorite_team.season_losses += 1
-                    
-                    # Update player stats for favorite team
-                    team_key = 'home_team' if is_favorite_home else 'away_team'
-                    for player_id, stats in result[team_key]['players'].items():
-                        player = session.query(Player).get(int(player_id))
-                        if player and str(player.team_id) == str(favorite_team_id):
-                            games_played = player.season_games + 1
-                            player.season_games = games_played
-                            player.season_ppg = ((player.season_ppg * (games_played - 1)) + stats['points']) / games_played
-                            player.season_rpg = ((player.season_rpg * (games_played - 1)) + stats['rebounds']) / games_played
-                            player.season_apg = ((player.season_apg * (games_played - 1)) + stats['assists']) / games_played
-                    
-                    session.commit()
-                    results.append(result)
-            
-            # Calculate final win rate for favorite team
-            if favorite_team and (favorite_team.season_wins + favorite_team.season_losses) > 0:
-                favorite_team.win_rate = favorite_team.season_wins / (favorite_team.season_wins + favorite_team.season_losses)
-                session.commit()
+            result = job.wait()
             
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
-            self.wfile.write(json.dumps({'success': True}).encode())
+            self.wfile.write(json.dumps(result).encode())
             
+        except ValueError as e:
+            print(f"Invalid {job_type} request: {e}")
+            self.send_error(400, str(e))
         except Exception as e:
-            session.rollback()
-            print(f"Error simulating season: {e}")
+            print(f"Error running {job_type}: {e}")
             self.send_error(500, str(e))
-        finally:
-            session.close()
+
+    def _handle_simulate_league(self):
+        """Handle POST request to simulate a full 30-team league season"""
+        content_length = int(self.headers.get('Content-Length') or 0)
+        post_data = self.rfile.read(content_length) if content_length else b'{}'
+        league_data = json.loads(post_data.decode('utf-8') or '{}')
+        self._run_job('simulate_league', league_data)
+
+    def _handle_project_season(self):
+        """Handle POST request for a Monte Carlo season projection"""
+        content_length = int(self.headers['Content-Length'])
+        post_data = self.rfile.read(content_length)
+        projection_data = json.loads(post_data.decode('utf-8'))
+        self._run_job('project_season', projection_data)
+
+    def _handle_create_job(self):
+        """Handle POST /jobs with {"type": ..., ...parameters}; always runs in the background"""
+        content_length = int(self.headers.get('Content-Length') or 0)
+        post_data = self.rfile.read(content_length) if content_length else b'{}'
+        job_data = json.loads(post_data.decode('utf-8') or '{}')
+        self._run_job(job_data.get('type'), {**job_data, 'background': True})
+
+    def _handle_get_job(self):
+        """Handle GET /jobs and /jobs/<job_id>"""
+        job_id = self.path.split('?')[0].rstrip('/').split('/')[-1]
+        if job_id == 'jobs':
+            body = [job.to_dict() for job in job_manager.list()]
+        else:
+            job = job_manager.get(job_id)
+            if not job:
+                self.send_error(404, "Job not found")
+                return
+            body = job.to_dict()
+        
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(body).encode())
+
+    def _handle_cancel_job(self):
+        """Handle DELETE /jobs/<job_id>"""
+        job = job_manager.cancel(self.path.rstrip('/').split('/')[-1])
+        if not job:
+            self.send_error(404, "Job not found")
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(job.to_dict()).encode())
 
     def _handle_season_mvp(self):
         """Handle GET request for team's season MVP data"""
@@ -613,11 +794,18 @@ class RequestHandler(SimpleHTTPRequestHandler):
         except Exception as e:
             print(f"Error getting team MVP: {e}")
             self.send_error(500, str(e))
+        finally:
+            if 'session' in locals():
+                session.close()
 
     def _handle_team_schedule(self):
         """Handle GET request for team's season schedule"""
         try:
             team_id = int(self.path.split('/')[-1])
+            cache_key = self._response_cache_key('games', 'rosters')
+            if self._send_cached(cache_key):
+                return
+            
             session = Session()
             
             games = session.query(Game)\
@@ -644,16 +832,14 @@ class RequestHandler(SimpleHTTPRequestHandler):
                     'arena': game.arena
                 })
             
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(schedule).encode())
+            self._send_json(schedule, cache_key=cache_key)
             
         except Exception as e:
             print(f"Error getting team schedule: {e}")
             self.send_error(500, str(e))
         finally:
-            session.close()
+            if 'session' in locals():
+                session.close()
 
     def _handle_team_info(self):
         """Handle GET request for team information"""
@@ -682,24 +868,27 @@ class RequestHandler(SimpleHTTPRequestHandler):
         except Exception as e:
             print(f"Error getting team info: {e}")
             self.send_error(500, str(e))
+        finally:
+            if 'session' in locals():
+                session.close()
 
     def _serve_file(self, filename):
-        """Serve static files"""
-        file_path = filename
+        """Serve a static file from memory, precompressed if the client accepts it"""
         try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
-                self.send_response(200)
-                if file_path.endswith('.html'):
-                    self.send_header('Content-type', 'text/html')
-                elif file_path.endswith('.css'):
-                    self.send_header('Content-type', 'text/css')
-                elif file_path.endswith('.js'):
-                    self.send_header('Content-type', 'application/javascript')
-                self.end_headers()
-                self.wfile.write(content)
+            static_file = static_files.get(filename)
         except FileNotFoundError:
             self.send_error(404, f"File {filename} not found")
+            return
+        
+        encoding = negotiate_encoding(self.headers.get('Accept-Encoding'))
+        if encoding not in static_file.bodies:
+            encoding = None
+        self._send_body(
+            static_file.bodies[encoding],
+            static_file.content_type,
+            encoded_etag(static_file.etag, encoding),
+            encoding
+        )
 
     def do_OPTIONS(self):
         """Handle preflight CORS requests"""
@@ -711,17 +900,27 @@ class RequestHandler(SimpleHTTPRequestHandler):
 
     def do_DELETE(self):
         """Handle DELETE requests"""
-        if self.path.startswith('/delete_game/'):
+        if self.path.startswith('/jobs/'):
+            self._handle_cancel_job()
+        elif self.path == '/cache':
+            self._handle_invalidate_cache()
+        elif self.path.startswith('/delete_game/'):
             try:
                 game_id = int(self.path.split('/')[-1])
                 session = Session()
                 
+                # Take the result out of the standings before the game goes
+                game = session.query(Game).get(game_id)
+                if game and game.home_team_score is not None and game.away_team_score is not None:
+                    apply_game_results(session, [(game.home_team_id, game.away_team_id, game.home_team_score, game.away_team_score)], sign=-1)
+                
                 # Delete associated records first
                 session.query(PlayerGameStat).filter_by(game_id=game_id).delete()
                 session.query(GameLineup).filter_by(game_id=game_id).delete()
                 session.query(Game).filter_by(game_id=game_id).delete()
                 
                 session.commit()
+                data_versions.bump('games', f'game:{game_id}')
                 
                 self.send_response(200)
                 self.send_header('Content-type', 'application/json')
@@ -731,7 +930,8 @@ class RequestHandler(SimpleHTTPRequestHandler):
                 print(f"Error deleting game: {str(e)}")
                 self.send_error(500, str(e))
             finally:
-                session.close()
+                if 'session' in locals():
+                    session.close()
         else:
             self.send_error(404)
 
@@ -742,6 +942,12 @@ class RequestHandler(SimpleHTTPRequestHandler):
             post_data = self.rfile.read(content_length)
             game_data = json.loads(post_data.decode('utf-8'))
             
+            try:
+                validate_seed(game_data.get('seed'))
+            except ValueError as e:
+                self.send_error(400, str(e))
+                return
+            
             try:
                 # Validate input data
                 if not game_data.get('home_players') or not game_data.get('away_players'):
@@ -766,9 +972,8 @@ class RequestHandler(SimpleHTTPRequestHandler):
                         session.commit()
                     
                     # Get home team arena for the venue
-                    home_team = session.query(Team).join(Player).filter(
-                        Player.player_id == game_data['home_players'][0]
-                    ).first()
+                    first_home_player = roster_cache.get_players(game_data['home_players'][:1])
+                    home_team = roster_cache.get_team(first_home_player[0].team_id) if first_home_player else None
                     
                     venue = home_team.arena if home_team else "Home Arena"
                     
@@ -777,13 +982,15 @@ class RequestHandler(SimpleHTTPRequestHandler):
                         game_data['home_players'],
                         game_data['away_players'],
                         arena=venue,
-                        resimulate_id=resimulate_id
+                        resimulate_id=resimulate_id,
+                        seed=game_data.get('seed'),
+                        compact=bool(game_data.get('compact'))
                     )
                     
                     self.send_response(200)
                     self.send_header('Content-type', 'application/json')
                     self.end_headers()
-                    self.wfile.write(json.dumps(result, cls=DatabaseJSONEncoder).encode())
+                    self.wfile.write(dumps(result))
                 
                 finally:
                     session.close()
@@ -791,8 +998,16 @@ class RequestHandler(SimpleHTTPRequestHandler):
             except Exception as e:
                 print(f"Error simulating game: {str(e)}")
                 self.send_error(500, str(e))
+        elif self.path == '/simulate_games':
+            self._handle_simulate_games()
         elif self.path == '/simulate_season':
             self._handle_simulate_season()
+        elif self.path == '/simulate_league':
+            self._handle_simulate_league()
+        elif self.path == '/project_season':
+            self._handle_project_season()
+        elif self.path == '/jobs':
+            self._handle_create_job()
         else:
             self.send_error(404)
 
@@ -801,10 +1016,57 @@ class RequestHandler(SimpleHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Origin', '*')
         SimpleHTTPRequestHandler.end_headers(self)
 
-def run_server():
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer that handles each connection on a bounded thread pool, so a slow
+    request no longer blocks every other one. Each handler opens its own session.
+    
+    At most max_queued connections wait for a free thread. When the backlog is
+    full, new connections get 503 Service Unavailable right away instead of
+    piling up behind long simulations.
+    """
+    
+    # Sent without reading the request when every worker and queue slot is taken
+    BUSY_RESPONSE = (
+        b'HTTP/1.0 503 Service Unavailable\r\n'
+        b'Retry-After: 1\r\n'
+        b'Content-Length: 0\r\n'
+        b'Connection: close\r\n\r\n'
+    )
+    
+    def __init__(self, server_address, handler_class, max_workers=8, max_queued=32):
+        super().__init__(server_address, handler_class)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='http')
+        self.slots = threading.BoundedSemaphore(max_workers + max_queued)
+    
+    def process_request(self, request, client_address):
+        if not self.slots.acquire(blocking=False):
+            try:
+                request.sendall(self.BUSY_RESPONSE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        self.executor.submit(self._process_request_thread, request, client_address)
+    
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+    
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+def run_server(max_workers=8):
+    static_files.preload(STATIC_PAGES)
     server_address = ('', 8000)
-    httpd = HTTPServer(server_address, RequestHandler)
-    print('Server running on port 8000...')
+    httpd = PooledHTTPServer(server_address, RequestHandler, max_workers=max_workers)
+    print(f'Server running on port 8000 with {max_workers} worker threads...')
     print('Access the application at http://localhost:8000')
     httpd.serve_forever()
 
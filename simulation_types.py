@@ -0,0 +1,98 @@
+# simulation_types.py
+
+# Player rating columns used by the simulation, in Player model order
+ROSTER_FIELDS = (
+    'avg_points',
+    'avg_rebounds',
+    'avg_assists',
+    'avg_steals',
+    'avg_blocks',
+    'avg_turnovers',
+    'avg_fouls',
+    'fg_percentage',
+)
+
+# Keys of a simulated stat line, matching simulate_player_performance
+STAT_FIELDS = (
+    'points',
+    'rebounds',
+    'assists',
+    'steals',
+    'blocks',
+    'turnovers',
+    'fouls',
+    'fgm',
+    'fga',
+    'minutes_played',
+)
+
+class PlayerRating:
+    """
+    The ratings the simulation reads for one player, detached from the ORM.
+    Build these once per roster with from_player and reuse them for every game.
+    """
+    __slots__ = ('player_id', 'team_id') + ROSTER_FIELDS
+
+    def __init__(self, player_id, team_id, avg_points, avg_rebounds, avg_assists, avg_steals,
+                 avg_blocks, avg_turnovers, avg_fouls, fg_percentage):
+        self.player_id = player_id
+        self.team_id = team_id
+        self.avg_points = avg_points
+        self.avg_rebounds = avg_rebounds
+        self.avg_assists = avg_assists
+        self.avg_steals = avg_steals
+        self.avg_blocks = avg_blocks
+        self.avg_turnovers = avg_turnovers
+        self.avg_fouls = avg_fouls
+        self.fg_percentage = fg_percentage
+
+    @classmethod
+    def from_player(cls, player):
+        """Convert a Player record or roster snapshot"""
+        return cls(player.player_id, player.team_id, *(getattr(player, field) for field in ROSTER_FIELDS))
+
+    def __repr__(self):
+        return f"PlayerRating(player_id={self.player_id}, team_id={self.team_id})"
+
+def to_ratings(players):
+    """Convert a list of Player records or snapshots, keeping their order"""
+    return [PlayerRating.from_player(player) for player in players]
+
+class StatLine:
+    """
+    One player's simulated box score. Fields are attributes; the line can also
+    be read like the dict it replaces (line['points'], dict(line), **line).
+    """
+    __slots__ = STAT_FIELDS
+
+    def __init__(self, points, rebounds, assists, steals, blocks, turnovers, fouls, fgm, fga, minutes_played):
+        self.points = points
+        self.rebounds = rebounds
+        self.assists = assists
+        self.steals = steals
+        self.blocks = blocks
+        self.turnovers = turnovers
+        self.fouls = fouls
+        self.fgm = fgm
+        self.fga = fga
+        self.minutes_played = minutes_played
+
+    def keys(self):
+        return STAT_FIELDS
+
+    def __getitem__(self, field):
+        if field not in STAT_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def to_dict(self):
+        """Plain dict for JSON responses and PlayerGameStat rows"""
+        return {field: getattr(self, field) for field in STAT_FIELDS}
+
+    def __eq__(self, other):
+        if not isinstance(other, StatLine):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in STAT_FIELDS)
+
+    def __repr__(self):
+        return f"StatLine({', '.join(f'{field}={getattr(self, field)!r}' for field in STAT_FIELDS)})"
@@ -0,0 +1,327 @@
+# stat_archive.py
+import argparse
+import json
+import struct
+from datetime import date, time, datetime
+import numpy as np
+from sqlalchemy import select, insert, Integer, Float, Boolean, Date, Time, String
+from database_setup import Session, Game, GameLineup, PlayerGameStat
+from team_stats import apply_game_results
+from caching import data_versions
+
+# File layout: fixed preamble, JSON header, then column blocks. Each block is
+# a little-endian array aligned to ALIGNMENT bytes so it can be memory-mapped.
+MAGIC = b'NBACOLS\0'
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct('<8sHI')  # magic, format version, header length
+ALIGNMENT = 64
+
+ARCHIVE_TABLES = (Game.__table__, GameLineup.__table__, PlayerGameStat.__table__)
+
+# Storage dtype per column kind. Dates are days since 1970-01-01, times are
+# microseconds since midnight and strings are codes into a per-column dictionary.
+KIND_DTYPES = {
+    'int': '<i8',
+    'float': '<f8',
+    'bool': '|u1',
+    'date': '<i8',
+    'time': '<i8',
+    'string': '<i4',
+}
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+def _column_kind(column):
+    for column_type, kind in ((Boolean, 'bool'), (Integer, 'int'), (Float, 'float'),
+                              (Date, 'date'), (Time, 'time'), (String, 'string')):
+        if isinstance(column.type, column_type):
+            return kind
+    raise TypeError(f"Unsupported column type {column.type} for {column.table.name}.{column.name}")
+
+def _encode_time(value):
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * 1000000 + value.microsecond
+
+def _decode_time(microseconds):
+    seconds, microsecond = divmod(int(microseconds), 1000000)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return time(hour, minute, second, microsecond)
+
+def _encode_column(kind, values):
+    """Turn a list of Python values into (data array, null mask or None, dictionary or None)"""
+    nulls = np.array([value is None for value in values], dtype=np.uint8)
+    mask = nulls if nulls.any() else None
+    dictionary = None
+
+    if kind == 'string':
+        dictionary = sorted({value for value in values if value is not None})
+        codes = {value: code for code, value in enumerate(dictionary)}
+        data = [codes.get(value, -1) for value in values]
+    elif kind == 'date':
+        data = [0 if value is None else value.toordinal() - EPOCH_ORDINAL for value in values]
+    elif kind == 'time':
+        data = [0 if value is None else _encode_time(value) for value in values]
+    else:
+        data = [0 if value is None else value for value in values]
+
+    return np.array(data, dtype=KIND_DTYPES[kind]), mask, dictionary
+
+def _pad(handle, position):
+    """Write zero bytes up to the next ALIGNMENT boundary and return the new position"""
+    padding = -position % ALIGNMENT
+    handle.write(b'\0' * padding)
+    return position + padding
+
+def _game_filters(season_id=None, start_date=None, end_date=None):
+    filters = []
+    if season_id is not None:
+        filters.append(Game.season_id == season_id)
+    if start_date is not None:
+        filters.append(Game.game_date >= start_date)
+    if end_date is not None:
+        filters.append(Game.game_date <= end_date)
+    return filters
+
+def export_archive(path, season_id=None, start_date=None, end_date=None):
+    """
+    Write games, lineups and player stat lines to a columnar archive file.
+
+    Rows are read with Core selects straight into column arrays, without
+    building ORM objects.
+
+    Parameters:
+    - path: str, file to write
+    - season_id: int, only export games from this season
+    - start_date, end_date: date, only export games played in this range (inclusive)
+
+    Returns the number of rows written per table.
+    """
+    filters = _game_filters(season_id, start_date, end_date)
+    game_ids = select(Game.game_id).where(*filters)
+
+    session = Session()
+    try:
+        tables = {}
+        for table in ARCHIVE_TABLES:
+            query = select(table).order_by(*table.primary_key.columns)
+            if table is Game.__table__:
+                query = query.where(*filters)
+            else:
+                query = query.where(table.c.game_id.in_(game_ids))
+            rows = session.execute(query).all()
+            columns = list(zip(*rows)) if rows else [()] * len(table.columns)
+            tables[table.name] = (len(rows), [
+                (column.name, _column_kind(column), list(values))
+                for column, values in zip(table.columns, columns)
+            ])
+    finally:
+        session.close()
+
+    # Encode every column, then lay the blocks out after the header
+    blocks = []
+    header = {
+        'format_version': FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'filters': {
+            'season_id': season_id,
+            'start_date': start_date.isoformat() if start_date else None,
+            'end_date': end_date.isoformat() if end_date else None
+        },
+        'tables': {}
+    }
+    offset = 0
+    for table_name, (row_count, columns) in tables.items():
+        column_specs = []
+        for name, kind, values in columns:
+            data, mask, dictionary = _encode_column(kind, values)
+            spec = {'name': name, 'kind': kind, 'dtype': KIND_DTYPES[kind], 'offset': offset, 'mask_offset': None}
+            blocks.append(data)
+            offset += data.nbytes + (-data.nbytes % ALIGNMENT)
+            if mask is not None:
+                spec['mask_offset'] = offset
+                blocks.append(mask)
+                offset += mask.nbytes + (-mask.nbytes % ALIGNMENT)
+            if dictionary is not None:
+                spec['dictionary'] = dictionary
+            column_specs.append(spec)
+        header['tables'][table_name] = {'rows': row_count, 'columns': column_specs}
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    with open(path, 'wb') as handle:
+        handle.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        handle.write(header_bytes)
+        _pad(handle, PREAMBLE.size + len(header_bytes))
+        for block in blocks:
+            handle.write(block.tobytes())
+            _pad(handle, block.nbytes)
+
+    return {table_name: row_count for table_name, (row_count, _) in tables.items()}
+
+def _read_header(handle):
+    magic, version, header_length = PREAMBLE.unpack(handle.read(PREAMBLE.size))
+    if magic != MAGIC:
+        raise ValueError("Not a stat archive")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Archive format version {version} is newer than supported version {FORMAT_VERSION}")
+    header = json.loads(handle.read(header_length).decode('utf-8'))
+    data_start = PREAMBLE.size + header_length
+    return header, data_start + (-data_start % ALIGNMENT)
+
+def read_archive(path, mmap=True):
+    """
+    Open a columnar archive for analytics.
+
+    Returns (header, tables) where tables maps table name -> {column: array}.
+    Numeric columns are memory-mapped read-only when mmap is True, so only the
+    pages that are touched get read. Dates come back as datetime64[D], times as
+    timedelta64[us] since midnight, strings as object arrays, and columns with
+    nulls as masked arrays.
+    """
+    with open(path, 'rb') as handle:
+        header, data_start = _read_header(handle)
+        if not mmap:
+            handle.seek(0)
+            raw = handle.read()
+
+    tables = {}
+    for table_name, table in header['tables'].items():
+        row_count = table['rows']
+
+        def block(dtype, offset):
+            if row_count == 0:
+                return np.empty(0, dtype=dtype)
+            if mmap:
+                return np.memmap(path, dtype=dtype, mode='r', offset=data_start + offset, shape=(row_count,))
+            return np.frombuffer(raw, dtype=dtype, count=row_count, offset=data_start + offset)
+
+        columns = {}
+        for spec in table['columns']:
+            data = block(spec['dtype'], spec['offset'])
+            if spec['kind'] == 'date':
+                data = data.view('<M8[D]')
+            elif spec['kind'] == 'time':
+                data = data.view('<m8[us]')
+            elif spec['kind'] == 'bool':
+                data = data.view(np.bool_)
+            elif spec['kind'] == 'string':
+                dictionary = np.array(spec['dictionary'] + [None], dtype=object)
+                data = dictionary[data]  # code -1 picks the trailing None
+
+            if spec['mask_offset'] is not None:
+                data = np.ma.MaskedArray(data, mask=block('|u1', spec['mask_offset']).view(np.bool_))
+            columns[spec['name']] = data
+        tables[table_name] = columns
+
+    return header, tables
+
+def _python_rows(header, tables, table_name):
+    """Decode one archived table back into row dicts with the original Python values"""
+    specs = header['tables'][table_name]['columns']
+    columns = []
+    for spec in specs:
+        data = tables[table_name][spec['name']]
+        mask = np.ma.getmaskarray(data) if isinstance(data, np.ma.MaskedArray) else None
+        values = np.ma.getdata(data)
+
+        if spec['kind'] == 'date':
+            decoded = [date.fromordinal(EPOCH_ORDINAL + int(days)) for days in values.view('<i8')]
+        elif spec['kind'] == 'time':
+            decoded = [_decode_time(microseconds) for microseconds in values.view('<i8')]
+        elif spec['kind'] == 'string':
+            decoded = list(values)
+        else:
+            decoded = values.tolist()
+
+        if mask is not None:
+            decoded = [None if is_null else value for value, is_null in zip(decoded, mask)]
+        columns.append((spec['name'], decoded))
+
+    return [dict(zip((name for name, _ in columns), row)) for row in zip(*(values for _, values in columns))]
+
+def import_archive(path, keep_ids=True):
+    """
+    Load an archive's games, lineups and stat lines back into the database in
+    one transaction, with executemany inserts instead of ORM objects.
+
+    With keep_ids the original primary keys are reused (an archive can only be
+    imported once into the same database). Without it, games get new IDs and
+    lineups and stat lines are re-pointed at them.
+
+    Standings are updated for the imported games. Returns rows inserted per table.
+    """
+    header, tables = read_archive(path)
+    games = _python_rows(header, tables, Game.__tablename__)
+    lineups = _python_rows(header, tables, GameLineup.__tablename__)
+    stats = _python_rows(header, tables, PlayerGameStat.__tablename__)
+
+    session = Session()
+    try:
+        if games:
+            if keep_ids:
+                session.execute(insert(Game.__table__), games)
+            else:
+                old_ids = [game.pop('game_id') for game in games]
+                new_ids = session.execute(
+                    insert(Game.__table__).returning(Game.__table__.c.game_id, sort_by_parameter_order=True),
+                    games
+                ).scalars().all()
+                id_map = dict(zip(old_ids, new_ids))
+                for row in lineups:
+                    row.pop('lineup_id')
+                    row['game_id'] = id_map[row['game_id']]
+                for row in stats:
+                    row.pop('stat_id')
+                    row['game_id'] = id_map[row['game_id']]
+        if lineups:
+            session.execute(insert(GameLineup.__table__), lineups)
+        if stats:
+            session.execute(insert(PlayerGameStat.__table__), stats)
+
+        apply_game_results(session, [
+            (game['home_team_id'], game['away_team_id'], game['home_team_score'], game['away_team_score'])
+            for game in games
+            if game['home_team_score'] is not None and game['away_team_score'] is not None
+        ])
+        session.commit()
+        data_versions.bump('games')
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+    return {
+        Game.__tablename__: len(games),
+        GameLineup.__tablename__: len(lineups),
+        PlayerGameStat.__tablename__: len(stats)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export or import games and stat lines as a columnar archive")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = commands.add_parser('export', help="write games and stats to an archive")
+    export_parser.add_argument('path')
+    export_parser.add_argument('--season', type=int, help="only games from this season ID")
+    export_parser.add_argument('--from', dest='start_date', type=date.fromisoformat, help="first game date (YYYY-MM-DD)")
+    export_parser.add_argument('--to', dest='end_date', type=date.fromisoformat, help="last game date (YYYY-MM-DD)")
+
+    import_parser = commands.add_parser('import', help="load an archive into the database")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--new-ids', action='store_true', help="assign new game IDs instead of reusing the archived ones")
+
+    info_parser = commands.add_parser('info', help="show an archive's header")
+    info_parser.add_argument('path')
+
+    args = parser.parse_args()
+    if args.command == 'export':
+        counts = export_archive(args.path, season_id=args.season, start_date=args.start_date, end_date=args.end_date)
+        print(f"Exported {counts} to {args.path}")
+    elif args.command == 'import':
+        counts = import_archive(args.path, keep_ids=not args.new_ids)
+        print(f"Imported {counts} from {args.path}")
+    else:
+        with open(args.path, 'rb') as handle:
+            header, _ = _read_header(handle)
+        print(f"Format version {header['format_version']}, created {header['created_at']}, filters {header['filters']}")
+        for table_name, table in header['tables'].items():
+            print(f"  {table_name}: {table['rows']} rows, columns {[spec['name'] for spec in table['columns']]}")
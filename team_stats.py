@@ -1,93 +1,150 @@
 # team_stats.py
-from sqlalchemy import func, desc
-from database_setup import Session, Team, Game, Player, PlayerGameStat
+import sys
+from sqlalchemy import func, desc, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from caching import roster_cache
+from database_setup import Session, Team, Game, Player, PlayerGameStat, TeamStanding, team_totals_query, rebuild_team_standings
 
-def update_team_records():
-    """Update win/loss records and stats for all teams"""
+def update_team_records(season_id=None, start_date=None, end_date=None):
+    """
+    Update win rate and scoring average for every team that has played.
+    
+    Wins, games and points come from one grouped SQL aggregation and all teams
+    are written with one bulk update, so no Game rows are loaded into Python.
+    
+    Parameters:
+    - season_id: int, only count games from this season
+    - start_date, end_date: date, only count games played in this range (inclusive)
+    """
     session = Session()
     try:
-        teams = session.query(Team).all()
+        totals = session.execute(team_totals_query(season_id, start_date, end_date)).all()
         
-        for team in teams:
-            # Get all home and away games
-            home_games = session.query(Game).filter(Game.home_team_id == team.team_id).all()
-            away_games = session.query(Game).filter(Game.away_team_id == team.team_id).all()
-            
-            wins = 0
-            total_points = 0
-            games_played = len(home_games) + len(away_games)
-            
-            # Process home games
-            for game in home_games:
-                if game.home_team_score > game.away_team_score:
-                    wins += 1
-                total_points += game.home_team_score
-                
-            # Process away games
-            for game in away_games:
-                if game.away_team_score > game.home_team_score:
-                    wins += 1
-                total_points += game.away_team_score
-            
-            # Update team stats
-            if games_played > 0:
-                team.win_rate = wins / games_played
-                team.avg_points = total_points / games_played
-            
-            session.add(team)
+        records = [
+            {
+                'team_id': row.team_id,
+                'win_rate': row.wins / row.games_played,
+                'avg_points': row.points_for / row.games_played
+            }
+            for row in totals if row.games_played > 0
+        ]
+        if records:
+            session.execute(update(Team), records)
         
         session.commit()
+        roster_cache.invalidate()
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
+
+STANDING_COUNTS = ('games_played', 'wins', 'losses', 'points_for', 'points_against')
+
+def apply_game_results(session, games, sign=1):
+    """
+    Add finished games to team_standings in the session's transaction, or
+    remove them with sign=-1. games is an iterable of
+    (home_team_id, away_team_id, home_score, away_score).
+    
+    Each team's changes are summed first and written with one upsert, so a
+    whole season costs a single statement.
+    """
+    deltas = {}
+    for home_team_id, away_team_id, home_score, away_score in games:
+        for team_id, points_for, points_against in (
+            (home_team_id, home_score, away_score),
+            (away_team_id, away_score, home_score)
+        ):
+            delta = deltas.setdefault(team_id, dict.fromkeys(STANDING_COUNTS, 0))
+            won = points_for > points_against
+            delta['games_played'] += sign
+            delta['wins'] += sign if won else 0
+            delta['losses'] += 0 if won else sign
+            delta['points_for'] += sign * points_for
+            delta['points_against'] += sign * points_against
+    
+    if not deltas:
+        return
+    
+    statement = sqlite_insert(TeamStanding)
+    statement = statement.on_conflict_do_update(
+        index_elements=['team_id'],
+        set_={
+            column: getattr(TeamStanding, column) + getattr(statement.excluded, column)
+            for column in STANDING_COUNTS
+        }
+    )
+    session.execute(statement, [{'team_id': team_id, **delta} for team_id, delta in deltas.items()])
+
+def rebuild_standings():
+    """Recompute team_standings from every game in the database"""
+    session = Session()
+    try:
+        rebuild_team_standings(session.connection())
+        session.commit()
     except Exception as e:
         session.rollback()
         raise e
     finally:
         session.close()
 
+def check_standings():
+    """
+    Compare team_standings with a full recount of the games table.
+    Returns a list of {'team_id', 'stored', 'expected'} for teams that differ.
+    """
+    session = Session()
+    try:
+        expected = {
+            row.team_id: {column: getattr(row, column) for column in STANDING_COUNTS}
+            for row in session.execute(team_totals_query())
+        }
+        stored = {
+            standing.team_id: {column: getattr(standing, column) for column in STANDING_COUNTS}
+            for standing in session.query(TeamStanding).all()
+        }
+        
+        zero = dict.fromkeys(STANDING_COUNTS, 0)
+        mismatches = []
+        for team_id, in session.query(Team.team_id).order_by(Team.team_id):
+            if stored.get(team_id, zero) != expected.get(team_id, zero):
+                mismatches.append({
+                    'team_id': team_id,
+                    'stored': stored.get(team_id),
+                    'expected': expected.get(team_id, zero)
+                })
+        return mismatches
+    finally:
+        session.close()
+
 def get_standings():
-    """Get current standings organized by conference and division"""
+    """
+    Get current standings organized by conference and division.
+    Reads the maintained team_standings table, so it is one query however many games exist.
+    """
     session = Session()
     try:
-        teams = session.query(Team).order_by(
-            Team.conference,
-            Team.division,
-            desc(Team.win_rate)
-        ).all()
+        rows = session.query(Team, TeamStanding)\
+            .outerjoin(TeamStanding, TeamStanding.team_id == Team.team_id)\
+            .order_by(Team.conference, Team.division, desc(Team.win_rate))\
+            .all()
         
         standings = {}
-        for team in teams:
+        for team, standing in rows:
             if team.conference not in standings:
                 standings[team.conference] = {}
             
             if team.division not in standings[team.conference]:
                 standings[team.conference][team.division] = []
             
-            # Get team's stats
-            home_games = session.query(Game).filter(Game.home_team_id == team.team_id)
-            away_games = session.query(Game).filter(Game.away_team_id == team.team_id)
-            
-            games_played = home_games.count() + away_games.count()
-            wins = 0
-            losses = 0
-            
-            for game in home_games:
-                if game.home_team_score > game.away_team_score:
-                    wins += 1
-                else:
-                    losses += 1
-                    
-            for game in away_games:
-                if game.away_team_score > game.home_team_score:
-                    wins += 1
-                else:
-                    losses += 1
-            
             team_data = {
                 'team_id': team.team_id,
                 'name': f"{team.city} {team.team_name}",
-                'wins': wins,
-                'losses': losses,
+                'wins': standing.wins if standing else 0,
+                'losses': standing.losses if standing else 0,
                 'win_rate': team.win_rate,
-                'games_played': games_played,
+                'games_played': standing.games_played if standing else 0,
                 'avg_points': team.avg_points if hasattr(team, 'avg_points') else 0
             }
             
@@ -146,4 +203,19 @@ def get_team_stats(team_id):
             }
         }
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+if __name__ == "__main__":
+    # python team_stats.py [check|rebuild]
+    command = sys.argv[1] if len(sys.argv) > 1 else 'check'
+    if command == 'rebuild':
+        rebuild_standings()
+        print("Standings rebuilt from game results")
+    
+    mismatches = check_standings()
+    if mismatches:
+        for mismatch in mismatches:
+            print(f"Team {mismatch['team_id']}: stored {mismatch['stored']}, expected {mismatch['expected']}")
+        print(f"{len(mismatches)} teams out of sync; run 'python team_stats.py rebuild'")
+        sys.exit(1)
+    print("Standings match game results")
@@ -0,0 +1,63 @@
+# tests/conftest.py
+import atexit
+import http.client
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# database_setup migrates its database on import; point it at a scratch file
+# so the tests never write to the checked-in nba_simulator.db
+_scratch_dir = tempfile.mkdtemp()
+atexit.register(shutil.rmtree, _scratch_dir, ignore_errors=True)
+os.environ['NBA_DATABASE_URL'] = f"sqlite:///{os.path.join(_scratch_dir, 'scratch.db')}"
+
+import database_setup
+from database_setup import Session, create_database_engine, migrate_schema
+from caching import data_versions
+import server
+
+@pytest.fixture
+def database(tmp_path):
+    """A copy of nba_simulator.db that Session is bound to for the test"""
+    path = tmp_path / 'nba_simulator.db'
+    shutil.copyfile(os.path.join(REPO_ROOT, 'nba_simulator.db'), path)
+    engine = create_database_engine(f'sqlite:///{path}', echo=False)
+    migrate_schema(engine)
+    Session.configure(bind=engine)
+    data_versions.bump('rosters', 'season', 'games')
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        Session.configure(bind=database_setup.engine)
+        data_versions.bump('rosters', 'season', 'games')
+
+def request(port, method, path, body=None):
+    """Send a request to the test server and return the response status"""
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    try:
+        connection.request(method, path, json.dumps(body) if body is not None else None)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+@pytest.fixture
+def http_server(database):
+    """The HTTP server on a free port, serving the database copy; yields the port"""
+    httpd = server.PooledHTTPServer(('127.0.0.1', 0), server.RequestHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield httpd.server_address[1]
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
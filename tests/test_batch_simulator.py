@@ -0,0 +1,48 @@
+# tests/test_batch_simulator.py
+import random
+import numpy as np
+import pytest
+from batch_simulator import build_roster_arrays, make_rng, simulate_player_performance_batch, stat_line
+from game_simulator import simulate_player_performance
+from simulation_types import PlayerRating
+
+def _players():
+    rng = random.Random(0)
+    return [
+        PlayerRating(
+            player_id, 1,
+            avg_points=rng.uniform(4, 30), avg_rebounds=rng.uniform(1, 12), avg_assists=rng.uniform(0.5, 9),
+            avg_steals=rng.uniform(0.2, 2), avg_blocks=rng.uniform(0.1, 2.5), avg_turnovers=rng.uniform(0.5, 4),
+            avg_fouls=rng.uniform(1, 4), fg_percentage=rng.uniform(0.38, 0.62)
+        )
+        for player_id in range(1, 9)
+    ]
+
+def test_make_rng_draws_like_random_seed():
+    for seed in (0, 7, 2 ** 40 + 3, 2 ** 63 - 1):
+        scalar = random.Random(seed)
+        batch = make_rng(seed)
+        assert batch.uniform(-1, 1, size=5).tolist() == [scalar.uniform(-1, 1) for _ in range(5)]
+
+@pytest.mark.parametrize('seed', [1, 12345, 2 ** 62 + 11])
+def test_seeded_batch_matches_scalar_path(seed):
+    players = _players()
+    n_games = 50
+    minutes = np.round(np.random.RandomState(seed % 2 ** 32).uniform(10, 38, size=(n_games, len(players))), 1)
+    is_starter = np.array([index < 5 for index in range(len(players))])
+
+    batch = simulate_player_performance_batch(
+        build_roster_arrays(players), minutes,
+        is_starter=is_starter, is_home_team=True, n_games=n_games,
+        performance_boost=1.05, rng=seed
+    )
+
+    rng = random.Random(seed)
+    for game in range(n_games):
+        for index, player in enumerate(players):
+            expected = simulate_player_performance(
+                player, float(minutes[game, index]),
+                is_starter=bool(is_starter[index]), is_home_team=True,
+                performance_boost=1.05, rng=rng
+            )
+            assert stat_line(batch, game, index).to_dict() == expected.to_dict()
@@ -0,0 +1,41 @@
+# tests/test_compression.py
+import gzip
+import zlib
+import pytest
+from compression import compress, negotiate_encoding
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    (None, None),
+    ('', None),
+    ('identity', None),
+    ('br', None),
+    ('gzip, deflate, br', 'gzip'),
+    ('deflate', 'deflate'),
+    ('GZIP', 'gzip'),
+    ('gzip;q=0.2, deflate;q=0.8', 'deflate'),
+])
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
+
+def test_q_zero_refuses_an_encoding():
+    assert negotiate_encoding('gzip;q=0, deflate;q=0.5') == 'deflate'
+    assert negotiate_encoding('gzip;q=0') is None
+    assert negotiate_encoding('gzip;q=0, deflate;q=0') is None
+
+def test_wildcard():
+    assert negotiate_encoding('*') == 'gzip'
+    assert negotiate_encoding('*;q=0') is None
+    assert negotiate_encoding('gzip;q=0, *') == 'deflate'
+    assert negotiate_encoding('*;q=0, deflate') == 'deflate'
+
+def test_malformed_quality_counts_as_zero():
+    assert negotiate_encoding('gzip;q=abc, deflate') == 'deflate'
+
+def test_compress_round_trip():
+    body = b'{"games": []}' * 200
+    assert gzip.decompress(compress(body, 'gzip')) == body
+    assert zlib.decompress(compress(body, 'deflate')) == body
+    # Fixed mtime, so equal bodies give equal bytes (and ETags)
+    assert compress(body, 'gzip') == compress(body, 'gzip')
+    with pytest.raises(ValueError):
+        compress(body, 'br')
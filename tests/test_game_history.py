@@ -0,0 +1,108 @@
+# tests/test_game_history.py
+from datetime import date, time
+from types import SimpleNamespace
+import pytest
+from database_setup import Session, Player
+from caching import data_versions, roster_cache
+from game_simulator import simulate_game
+from game_history import encode_cursor, decode_cursor, load_game_history
+
+def test_cursor_round_trip():
+    game = SimpleNamespace(game_date=date(2024, 3, 5), game_time=time(19, 30), game_id=42)
+    cursor = encode_cursor(game)
+    assert cursor == '2024-03-05_19:30:00_42'
+    assert decode_cursor(cursor) == (date(2024, 3, 5), time(19, 30), 42)
+
+def test_cursor_keeps_microseconds():
+    game = SimpleNamespace(game_date=date(2024, 3, 5), game_time=time(19, 30, 5, 250), game_id=7)
+    assert decode_cursor(encode_cursor(game)) == (date(2024, 3, 5), time(19, 30, 5, 250), 7)
+
+@pytest.mark.parametrize('cursor', [None, '', 'abc', '2024-03-05_19:30:00', '2024-13-05_19:30:00_1', '2024-03-05_19:30:00_x', '2024-03-05_19:30:00_1_2'])
+def test_decode_cursor_rejects_bad_cursors(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_pages_cover_history_once_in_order(database):
+    session = Session()
+    try:
+        everything, next_cursor = load_game_history(session, summary=True)
+        assert next_cursor is None
+
+        paged, cursor = [], None
+        while True:
+            games, cursor = load_game_history(session, limit=200, cursor=cursor, summary=True)
+            paged.extend(games)
+            if cursor is None:
+                break
+        assert [game['game']['game_id'] for game in paged] == [game['game']['game_id'] for game in everything]
+        keys = [(game['game']['date'], game['game']['time'], game['game']['game_id']) for game in paged]
+        assert keys == sorted(keys, reverse=True)
+    finally:
+        session.close()
+
+def test_after_returns_only_newer_games(database):
+    home_players = [player.player_id for player in roster_cache.get_team_players(1)[:8]]
+    away_players = [player.player_id for player in roster_cache.get_team_players(2)[:8]]
+    session = Session()
+    try:
+        games, _ = load_game_history(session, limit=1, summary=True)
+        newest = SimpleNamespace(game_date=games[0]['game']['date'], game_time=games[0]['game']['time'], game_id=games[0]['game']['game_id'])
+        assert load_game_history(session, after=encode_cursor(newest), summary=True) == ([], None)
+
+        game_id = simulate_game(home_players, away_players, seed=4)['game_id']
+        newer, _ = load_game_history(session, after=encode_cursor(newest), summary=True)
+        assert [game['game']['game_id'] for game in newer] == [game_id]
+    finally:
+        session.close()
+
+def test_compact_box_score_unavailable_after_ratings_change(database):
+    home_players = [player.player_id for player in roster_cache.get_team_players(1)[:8]]
+    away_players = [player.player_id for player in roster_cache.get_team_players(2)[:8]]
+    result = simulate_game(home_players, away_players, seed=3, compact=True)
+    game_id = result['game_id']
+
+    session = Session()
+    try:
+        games, _ = load_game_history(session, limit=1)
+        assert games[0]['game']['game_id'] == game_id
+        assert games[0]['game']['box_score_available']
+        assert sum(line['stats']['points'] for line in games[0]['home_team']['players']) == result['home_team']['score']
+
+        # A big ratings change means the seed no longer reproduces the stored score
+        session.query(Player).filter(Player.player_id.in_(home_players + away_players)).update(
+            {Player.avg_points: Player.avg_points * 3}, synchronize_session=False
+        )
+        session.commit()
+        data_versions.bump('rosters')
+
+        games, _ = load_game_history(session, limit=1)
+        assert not games[0]['game']['box_score_available']
+        assert games[0]['home_team']['players'] == []
+        assert games[0]['away_team']['players'] == []
+        assert games[0]['game']['home_score'] == result['home_team']['score']
+    finally:
+        session.close()
+
+def test_unreplayable_game_does_not_fail_the_page(database):
+    home_players = [player.player_id for player in roster_cache.get_team_players(1)[:8]]
+    away_players = [player.player_id for player in roster_cache.get_team_players(2)[:8]]
+    broken_id = simulate_game(home_players, away_players, seed=5, compact=True)['game_id']
+
+    # Deleting a player (as populate_nba_players.py does) leaves the game's lineups pointing nowhere
+    session = Session()
+    try:
+        session.query(Player).filter(Player.player_id == home_players[-1]).delete()
+        session.commit()
+        data_versions.bump('rosters')
+
+        other_players = [player.player_id for player in roster_cache.get_team_players(3)[:8]]
+        intact_id = simulate_game(other_players, away_players, seed=6, compact=True)['game_id']
+
+        games, _ = load_game_history(session, limit=2)
+        by_id = {game['game']['game_id']: game for game in games}
+        assert not by_id[broken_id]['game']['box_score_available']
+        assert by_id[broken_id]['home_team']['players'] == []
+        assert by_id[intact_id]['game']['box_score_available']
+        assert by_id[intact_id]['home_team']['players']
+    finally:
+        session.close()
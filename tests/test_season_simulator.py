@@ -0,0 +1,91 @@
+# tests/test_season_simulator.py
+import random
+from collections import Counter
+from datetime import timedelta
+import pytest
+from database_setup import Session, Team, Game, team_totals_query
+from season_simulator import simulate_favorite_team_season, get_mvp_leaderboard, generate_league_schedule, simulate_league_season
+from team_stats import check_standings
+from caching import data_versions
+
+@pytest.mark.parametrize('season_year', [2024, 2025, 2026])
+def test_league_schedule_is_balanced(database, season_year):
+    schedule = generate_league_schedule(season_year, rng=random.Random(season_year))
+    assert len(schedule) == 1230
+
+    session = Session()
+    try:
+        teams = {team.team_id: team for team in session.query(Team).all()}
+    finally:
+        session.close()
+
+    home_games = Counter(home_id for _, _, home_id, _ in schedule)
+    away_games = Counter(away_id for _, _, _, away_id in schedule)
+    for team_id in teams:
+        assert home_games[team_id] == 41
+        assert away_games[team_id] == 41
+
+    # No team plays twice on one day or three days running, and every tip-off slot is unique
+    days = {}
+    for game_date, _, home_id, away_id in schedule:
+        for team_id in (home_id, away_id):
+            assert game_date not in days.setdefault(team_id, set())
+            days[team_id].add(game_date)
+    for played in days.values():
+        for game_date in played:
+            assert not {game_date + timedelta(days=1), game_date + timedelta(days=2)} <= played
+    assert len({(game_date, game_time) for game_date, game_time, _, _ in schedule}) == 1230
+    assert [game_date for game_date, _, _, _ in schedule] == sorted(game_date for game_date, _, _, _ in schedule)
+
+    meetings = Counter(frozenset((home_id, away_id)) for _, _, home_id, away_id in schedule)
+    for pair, count in meetings.items():
+        team_a, team_b = (teams[team_id] for team_id in pair)
+        if team_a.division == team_b.division:
+            assert count == 4
+        elif team_a.conference == team_b.conference:
+            assert count in (3, 4)
+        else:
+            assert count == 2
+
+def test_league_season_plays_every_team_82_games(database):
+    standings = simulate_league_season(season_id=3000, seed=1)
+    records = [record for records in standings.values() for record in records]
+    assert len(records) == 30
+    assert all(record['wins'] + record['losses'] == 82 for record in records)
+    assert sum(record['wins'] for record in records) == 1230
+
+    session = Session()
+    try:
+        totals = session.execute(team_totals_query(season_id=3000)).all()
+    finally:
+        session.close()
+    assert sorted(row.games_played for row in totals) == [82] * 30
+    assert check_standings() == []
+
+def test_resimulated_season_replaces_its_games(database):
+    simulate_favorite_team_season(1, games_count=20, seed=1)
+    simulate_favorite_team_season(1, games_count=20, seed=2)
+
+    session = Session()
+    try:
+        team = session.get(Team, 1)
+        season_id = session.query(Game.season_id).filter(Game.is_season_game == True).order_by(Game.game_id.desc()).first()[0]
+        season_games = session.query(Game).filter(
+            Game.season_id == season_id,
+            (Game.home_team_id == 1) | (Game.away_team_id == 1)
+        ).count()
+        assert season_games == team.season_wins + team.season_losses
+    finally:
+        session.close()
+
+    # Only the favorite team's players have totals for this season
+    leaders = get_mvp_leaderboard(limit=3, season_id=season_id)
+    assert leaders['leaders']
+    for leader in leaders['leaders']:
+        assert leader['team']['team_id'] == 1
+        assert leader['team']['season_wins'] == team.season_wins
+    assert check_standings() == []
+
+    # Deleting or resimulating a game changes win counts, so it invalidates the cache
+    data_versions.bump('games')
+    assert get_mvp_leaderboard(limit=3, season_id=season_id) is not leaders
@@ -0,0 +1,45 @@
+# tests/test_serializers.py
+import json
+from datetime import date, time
+import pytest
+import serializers
+from serializers import dumps, row_serializer, model_serializer
+from database_setup import Session, Team
+from simulation_types import StatLine
+
+PAYLOAD = {
+    'team': {'team_id': 1, 'city': 'Montréal', 'team_name': 'Élan', 'win_rate': 0.5},
+    'date': date(2024, 10, 22),
+    'time': time(19, 30),
+    'line': StatLine(20, 5, 4, 1, 0, 2, 3, 8, 15, 33.5),
+    'seed': 2 ** 63 - 1,
+    'scores': [101, 99]
+}
+
+def _baseline(data):
+    """What the handlers sent before serializers existed"""
+    return json.dumps(data, default=serializers._default).encode()
+
+def test_default_backend_matches_json_module_bytes():
+    assert serializers.JSON_BACKEND == 'json'
+    assert dumps(PAYLOAD) == _baseline(PAYLOAD)
+    assert b'Montr\\u00e9al' in dumps(PAYLOAD)
+
+def test_compiled_serializers_match_column_reflection(database):
+    session = Session()
+    try:
+        teams = session.query(Team).order_by(Team.team_id).all()
+        rows = session.execute(Team.__table__.select().order_by(Team.team_id)).all()
+    finally:
+        session.close()
+    reflected = [{column.name: getattr(team, column.name) for column in Team.__table__.columns} for team in teams]
+    assert [model_serializer(Team)(team) for team in teams] == reflected
+    assert [row_serializer(Team)(row) for row in rows] == reflected
+    assert dumps([row_serializer(Team)(row) for row in rows]) == json.dumps(reflected).encode()
+
+def test_orjson_backend_decodes_to_the_same_values(monkeypatch):
+    orjson = pytest.importorskip('orjson')
+    monkeypatch.setattr(serializers, 'orjson', orjson)
+    assert json.loads(dumps(PAYLOAD)) == json.loads(_baseline(PAYLOAD))
+    # Integers wider than 64 bits fall back to the json module
+    assert dumps({'seed': 2 ** 70}) == b'{"seed": 1180591620717411303424}'
@@ -0,0 +1,45 @@
+# tests/test_simulate_games.py
+import pytest
+from caching import roster_cache
+from game_simulator import simulate_matchups
+from conftest import request
+
+def _lineup(team_id, size=8):
+    return [player.player_id for player in roster_cache.get_team_players(team_id)[:size]]
+
+def test_same_seed_gives_same_batch(database):
+    matchups = [{'home_players': _lineup(1), 'away_players': _lineup(2)}]
+    first = simulate_matchups(matchups, repetitions=5, seed=9)
+    assert simulate_matchups(matchups, repetitions=5, seed=9) == first
+    assert first['games_simulated'] == 5
+
+@pytest.mark.parametrize('change, message', [
+    (lambda home, away: (home + home[:1], away), 'more than once on the home side'),
+    (lambda home, away: (home, away[:5] + away[:1]), 'more than once on the away side'),
+    (lambda home, away: (home, away[:5] + home[:1]), 'both sides'),
+])
+def test_rejects_repeated_players(database, change, message):
+    home_players, away_players = change(_lineup(1), _lineup(2))
+    with pytest.raises(ValueError, match=message):
+        simulate_matchups([{'home_players': home_players, 'away_players': away_players}])
+
+@pytest.mark.parametrize('body', [
+    {'matchups': [1]},
+    {'matchups': {'home_players': []}},
+    {'repetitions': 2.7},
+    {'repetitions': '3'},
+    {'repetitions': True},
+    {'seed': 2 ** 70, 'persist': True},
+    {'seed': '5'},
+    {'duplicate_home': True},
+])
+def test_invalid_batches_get_400(http_server, body):
+    home_players, away_players = _lineup(1), _lineup(2)
+    if body.pop('duplicate_home', False):
+        home_players = home_players + home_players[:1]
+    payload = {'home_players': home_players, 'away_players': away_players, **body}
+    assert request(http_server, 'POST', '/simulate_games', payload) == 400
+
+def test_valid_batch_succeeds(http_server):
+    payload = {'home_players': _lineup(1), 'away_players': _lineup(2), 'repetitions': 3, 'seed': 2 ** 63 - 1}
+    assert request(http_server, 'POST', '/simulate_games', payload) == 200
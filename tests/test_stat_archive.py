@@ -0,0 +1,52 @@
+# tests/test_stat_archive.py
+from sqlalchemy import delete, select
+from database_setup import Session, Game, GameLineup, PlayerGameStat, TeamStanding
+from caching import roster_cache
+from game_simulator import simulate_game
+from stat_archive import export_archive, import_archive
+from team_stats import apply_game_results, check_standings
+
+def _snapshot():
+    """Every row of the archived tables and team_standings, in primary key order"""
+    session = Session()
+    try:
+        return {
+            table.name: session.execute(select(table).order_by(*table.primary_key.columns)).all()
+            for table in (Game.__table__, GameLineup.__table__, PlayerGameStat.__table__, TeamStanding.__table__)
+        }
+    finally:
+        session.close()
+
+def test_export_wipe_import_round_trip(database, tmp_path):
+    home_players = [player.player_id for player in roster_cache.get_team_players(1)[:8]]
+    away_players = [player.player_id for player in roster_cache.get_team_players(2)[:8]]
+    simulate_game(home_players, away_players, seed=1)
+    simulate_game(home_players, away_players, seed=2, compact=True)
+    before = _snapshot()
+
+    path = str(tmp_path / 'games.nbacols')
+    counts = export_archive(path)
+    assert counts == {
+        'games': len(before['games']),
+        'game_lineups': len(before['game_lineups']),
+        'player_game_stats': len(before['player_game_stats'])
+    }
+
+    session = Session()
+    try:
+        apply_game_results(session, [
+            (game.home_team_id, game.away_team_id, game.home_team_score, game.away_team_score)
+            for game in before['games']
+            if game.home_team_score is not None and game.away_team_score is not None
+        ], sign=-1)
+        session.execute(delete(PlayerGameStat))
+        session.execute(delete(GameLineup))
+        session.execute(delete(Game))
+        session.commit()
+    finally:
+        session.close()
+    assert not _snapshot()['games']
+
+    assert import_archive(path, keep_ids=True) == counts
+    assert _snapshot() == before
+    assert check_standings() == []
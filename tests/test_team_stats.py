@@ -0,0 +1,44 @@
+# tests/test_team_stats.py
+from database_setup import Session, TeamStanding
+from caching import roster_cache
+from game_simulator import simulate_game
+from team_stats import check_standings, rebuild_standings
+from conftest import request
+
+def _standing(team_id):
+    session = Session()
+    try:
+        standing = session.get(TeamStanding, team_id)
+        return (standing.games_played, standing.wins, standing.losses, standing.points_for, standing.points_against)
+    finally:
+        session.close()
+
+def test_standings_follow_simulate_resimulate_and_delete(http_server):
+    home_players = [player.player_id for player in roster_cache.get_team_players(1)[:8]]
+    away_players = [player.player_id for player in roster_cache.get_team_players(2)[:8]]
+    assert check_standings() == []
+    games_before = _standing(1)[0]
+
+    result = simulate_game(home_players, away_players, seed=1)
+    game_id = result['game_id']
+    assert check_standings() == []
+    assert _standing(1)[0] == games_before + 1
+
+    assert request(http_server, 'POST', '/simulate_game', {
+        'home_players': home_players, 'away_players': away_players, 'resimulate_id': game_id, 'seed': 2
+    }) == 200
+    assert check_standings() == []
+    assert _standing(1)[0] == games_before + 1
+
+    assert request(http_server, 'DELETE', f'/delete_game/{game_id}') == 200
+    assert check_standings() == []
+    assert _standing(1)[0] == games_before
+
+def test_rebuild_matches_incremental_standings(database):
+    home_players = [player.player_id for player in roster_cache.get_team_players(3)[:8]]
+    away_players = [player.player_id for player in roster_cache.get_team_players(4)[:8]]
+    for seed in range(5):
+        simulate_game(home_players, away_players, seed=seed)
+    incremental = [_standing(team_id) for team_id in (3, 4)]
+    rebuild_standings()
+    assert [_standing(team_id) for team_id in (3, 4)] == incremental